@@ -1,15 +1,25 @@
 from __future__ import absolute_import
 
+import codecs
+import errno
 import glob
+import hashlib
 import os
 import platform
+import queue
+import re
 import shutil
 import stat
+import threading
 import time
-from fnmatch import fnmatch
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch, translate as fnmatch_translate
+from functools import lru_cache
 from typing import AnyStr
 
 import chardet
+from chardet import UniversalDetector
 
 from base.c_exceptions import PathNotCreateException
 from base.c_os import COS
@@ -17,15 +27,253 @@ from base.c_resource import CResource
 from base.c_utils import CUtils
 
 
+class CFileEntry:
+    """
+    目录项对象, 基于os.scandir返回的DirEntry封装
+
+    1. DirEntry在扫描目录时已缓存了类型信息, is_dir/is_file在大多数系统上不再产生额外的stat调用
+    2. size和modify_time在首次访问时执行一次stat, 之后使用DirEntry内部缓存的结果
+    3. 全路径在首次访问时才进行拼接, 与CFile.join_file的拼接结果一致
+    """
+    __slots__ = ('__dir_entry', '__path', '__file_name_with_path')
+
+    def __init__(self, dir_entry: os.DirEntry, path: str):
+        self.__dir_entry = dir_entry
+        self.__path = path
+        self.__file_name_with_path = None
+
+    @property
+    def name(self) -> str:
+        """文件名或目录名(不包含路径)"""
+        return self.__dir_entry.name
+
+    @property
+    def path(self) -> str:
+        """所在的目录"""
+        return self.__path
+
+    @property
+    def file_name_with_path(self) -> str:
+        """文件或目录的全路径"""
+        if self.__file_name_with_path is None:
+            self.__file_name_with_path = CFile.join_file(self.__path, self.__dir_entry.name)
+        return self.__file_name_with_path
+
+    @property
+    def is_dir(self) -> bool:
+        """是否为目录(跟随符号链接, 与CFile.is_dir一致)"""
+        try:
+            return self.__dir_entry.is_dir()
+        except OSError:
+            return False
+
+    @property
+    def is_file(self) -> bool:
+        """是否为文件(跟随符号链接, 与CFile.is_file一致)"""
+        try:
+            return self.__dir_entry.is_file()
+        except OSError:
+            return False
+
+    @property
+    def size(self) -> int:
+        """文件大小"""
+        return self.__dir_entry.stat().st_size
+
+    @property
+    def modify_time(self) -> float:
+        """文件修改时间"""
+        return self.__dir_entry.stat().st_mtime
+
+    @property
+    def dir_entry(self) -> os.DirEntry:
+        """原始的DirEntry对象"""
+        return self.__dir_entry
+
+    def __repr__(self):
+        return 'CFileEntry({0})'.format(self.file_name_with_path)
+
+
+class CFileMatcher:
+    """
+    文件名匹配器, 将匹配字符一次性编译为一个正则表达式, 之后每次匹配只执行一次正则匹配
+
+    1. 匹配字符可以是通配符(MatchType_Common)或正则表达式(MatchType_Regex)
+    2. 匹配字符可以是多个匹配字符组成的列表, 任意一个匹配即为匹配, 与CFile.file_match_list一致
+    3. 通配符匹配与fnmatch一致(在win系统中不区分大小写), 正则表达式匹配与CUtils.text_match_re一致
+    4. CFile中所有接收match_str的方法均可直接传入本对象
+    """
+    MatchType_Common = 1
+    MatchType_Regex = 2
+
+    __slots__ = ('__match_all', '__match_func_list', '__normcase')
+
+    def __init__(self, match_str='*', match_type: int = MatchType_Common):
+        if isinstance(match_str, str):
+            match_str_list = [match_str]
+        else:
+            match_str_list = list(match_str)
+
+        self.__match_all = '*' in match_str_list
+        self.__match_func_list = []
+        self.__normcase = False
+        if self.__match_all:
+            return
+
+        if self.MatchType_Common == match_type:
+            # fnmatch会对文件名和通配符做normcase处理, 在win系统中即为不区分大小写
+            self.__normcase = os.path.normcase('A') != 'A'
+            if len(match_str_list) > 0:
+                regex = re.compile(
+                    '|'.join([fnmatch_translate(os.path.normcase(match_item)) for match_item in match_str_list])
+                )
+                self.__match_func_list = [regex.match]
+        else:
+            regex_list = []
+            for regex_str in match_str_list:
+                # noinspection PyBroadException
+                try:
+                    regex_list.append(re.compile(regex_str))
+                except Exception:
+                    # 与CUtils.text_match_re一致, 非法的正则表达式视为不匹配
+                    pass
+            # 含有分组的正则表达式可能存在反向引用, 合并后分组序号会变化, 因此只合并不含分组的正则表达式
+            if len(regex_list) > 1 and all(regex.groups == 0 for regex in regex_list):
+                # noinspection PyBroadException
+                try:
+                    regex_list = [re.compile('|'.join(['(?:{0})'.format(regex.pattern) for regex in regex_list]))]
+                except Exception:
+                    pass
+            self.__match_func_list = [regex.search for regex in regex_list]
+
+    @classmethod
+    def of(cls, match_str='*', match_type: int = MatchType_Common):
+        """获取匹配字符对应的匹配器, 字符串及字符串列表编译后的匹配器将被缓存
+
+        Args:
+            match_str: 匹配字符, 可以是字符串、字符串列表或匹配器
+            match_type: 匹配类型
+
+        Returns:
+            匹配器
+        """
+        if isinstance(match_str, CFileMatcher):
+            return match_str
+        if isinstance(match_str, str):
+            return _cached_file_matcher(match_str, match_type)
+        return _cached_file_matcher(tuple(match_str), match_type)
+
+    @property
+    def match_all(self) -> bool:
+        """是否匹配全部"""
+        return self.__match_all
+
+    def match(self, name: str) -> bool:
+        """对文件名或目录名进行匹配
+
+        Args:
+            name: 文件名或目录名
+
+        Returns:
+            是否匹配
+        """
+        if self.__match_all:
+            return True
+
+        if self.__normcase:
+            name = os.path.normcase(name)
+
+        for match_func in self.__match_func_list:
+            if match_func(name) is not None:
+                return True
+        return False
+
+
+@lru_cache(maxsize=256)
+def _cached_file_matcher(match_str, match_type: int) -> CFileMatcher:
+    return CFileMatcher(match_str, match_type)
+
+
+class CFileEncodingCache:
+    """
+    文件编码识别结果缓存, 进程内共享, 线程安全
+
+    1. 以(文件绝对路径, 文件大小, 修改时间纳秒, 识别字节数)为key, 文件未变化时直接返回上次的识别结果
+    2. 超过最大缓存个数后, 淘汰最久未使用的记录
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.__lock = threading.Lock()
+        self.__cache = OrderedDict()
+        self.__max_size = max_size
+        self.__hit_count = 0
+        self.__miss_count = 0
+
+    def get(self, key):
+        """获取缓存的识别结果, 不存在时返回None, 同时统计命中与未命中次数"""
+        with self.__lock:
+            identify_result = self.__cache.get(key)
+            if identify_result is None:
+                self.__miss_count = self.__miss_count + 1
+            else:
+                self.__hit_count = self.__hit_count + 1
+                self.__cache.move_to_end(key)
+            return identify_result
+
+    def put(self, key, identify_result):
+        """缓存识别结果"""
+        with self.__lock:
+            self.__cache[key] = identify_result
+            self.__cache.move_to_end(key)
+            while len(self.__cache) > self.__max_size:
+                self.__cache.popitem(last=False)
+
+    def clear(self):
+        """清空缓存及统计信息"""
+        with self.__lock:
+            self.__cache.clear()
+            self.__hit_count = 0
+            self.__miss_count = 0
+
+    @property
+    def hit_count(self) -> int:
+        """命中次数"""
+        return self.__hit_count
+
+    @property
+    def miss_count(self) -> int:
+        """未命中次数"""
+        return self.__miss_count
+
+    @property
+    def size(self) -> int:
+        """当前缓存的记录个数"""
+        return len(self.__cache)
+
+
 class CFile:
     """
     文件操作工具类
     """
     unify_seperator = '/'
-    MatchType_Common = 1
-    MatchType_Regex = 2
+    MatchType_Common = CFileMatcher.MatchType_Common
+    MatchType_Regex = CFileMatcher.MatchType_Regex
 
     file_name_Maximum_length = 255
+    # 按块读取文件时每块的大小
+    file_read_chunk_size = 64 * 1024
+    # 增量识别编码时最多读取的字节数
+    encoding_detect_Maximum_size = 1024 * 1024
+    # 在内核中直接复制文件数据时, 每次调用复制的最大字节数
+    file_copy_chunk_size = 64 * 1024 * 1024
+    # 可断点续传复制时的块大小
+    file_resume_chunk_size = 64 * 1024 * 1024
+    # 内核直接复制不被支持时的错误码, 此时改用其他复制方式
+    __zero_copy_unsupported_errno_list = [
+        errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSOCK
+    ]
+    # 文件编码识别结果缓存
+    file_encoding_cache = CFileEncodingCache()
 
     __special_file_ext_list = ['tar.gz']
 
@@ -199,6 +447,7 @@ class CFile:
 
             1. 可以支持常规检索和正则表达式检索
             2. 返回当前目录下的文件和子目录(不包含路径!!!)
+            3. match_str可以是匹配字符列表或CFileMatcher匹配器, 其他检索、删除和统计方法同样适用
 
             Args:
                 path: 文件路径
@@ -208,24 +457,89 @@ class CFile:
             Returns:
                 匹配到的文件列表
         """
-        if not cls.file_or_path_exist(path):
-            return []
+        return list(cls.iter_file_or_subpath_of_path(path, match_str, match_type))
 
-        list_all_file = os.listdir(cls.compatible_long_path(path))
-        if match_str == '*':
-            return list_all_file
-            # return SortedList(list_all_file)
+    @classmethod
+    def iter_file_or_subpath_of_path(cls, path: str, match_str: str = '*', match_type: int = MatchType_Common):
+        """
+            file_or_subpath_of_path的迭代器版本, 边扫描边返回, 可随时中止
 
-        list_match_file = []
-        for item_file_name in list_all_file:
-            if cls.MatchType_Common == match_type:
-                if cls.file_match(item_file_name, match_str):
-                    list_match_file.append(item_file_name)
-            else:
-                if CUtils.text_match_re(item_file_name, match_str):
-                    list_match_file.append(item_file_name)
-        return list_match_file
-        # return SortedList(list_match_file)
+            Args:
+                path: 文件路径
+                match_str: 匹配字符
+                match_type: 匹配类型
+
+            Returns:
+                匹配到的文件和子目录名称(不包含路径)的迭代器
+        """
+        matcher = CFileMatcher.of(match_str, match_type)
+        for entry in cls.entry_of_path(path):
+            if matcher.match(entry.name):
+                yield entry.name
+
+    @classmethod
+    def entry_of_path(cls, path: str):
+        """
+            获取指定目录下的一级目录项, 每个目录仅调用一次os.scandir
+
+            1. 目录不存在时不返回任何目录项
+            2. 目录项的类型、大小和修改时间均使用os.scandir的缓存, 避免对每个目录项重复调用stat
+
+            Args:
+                path: 文件路径
+
+            Returns:
+                目录项(CFileEntry)的迭代器
+        """
+        if path is None:
+            return
+
+        try:
+            dir_iterator = os.scandir(cls.compatible_long_path(path))
+        except FileNotFoundError:
+            return
+
+        with dir_iterator:
+            for dir_entry in dir_iterator:
+                yield CFileEntry(dir_entry, path)
+
+    @classmethod
+    def walk_entry_of_path(cls, path: str, is_recurse_subpath: bool = False, match_str: str = '*',
+                           match_type: int = MatchType_Common, is_recurse_subpath_all_file: bool = False):
+        """
+            根据路径遍历匹配的目录项, 每个目录仅扫描一次
+
+            1. is_recurse_subpath为True时, 匹配到的子目录将紧随其后被递归遍历(只能匹配父目录已匹配的子目录)
+            2. is_recurse_subpath_all_file为True时, 先返回当前目录匹配的目录项, 再递归遍历全部子目录
+
+            Args:
+                path: 扫描的目录
+                is_recurse_subpath: 是否递归子目录（只能匹配父目录已匹配的子目录）
+                match_str: 匹配字符串
+                match_type: 匹配类型
+                is_recurse_subpath_all_file: 是否匹配子路径（全部匹配）
+
+            Returns:
+                匹配到的目录项(CFileEntry)的迭代器
+        """
+        matcher = CFileMatcher.of(match_str, match_type)
+        recurse_all_subpath = is_recurse_subpath_all_file and (not is_recurse_subpath)
+        # 仅缓存待递归的子目录, 内存占用只与单个目录下的子目录个数相关
+        sub_path_list = []
+        for entry in cls.entry_of_path(path):
+            if matcher.match(entry.name):
+                yield entry
+                if is_recurse_subpath and entry.is_dir:
+                    yield from cls.walk_entry_of_path(
+                        entry.file_name_with_path, is_recurse_subpath, matcher, match_type
+                    )
+            if recurse_all_subpath and entry.is_dir:
+                sub_path_list.append(entry.file_name_with_path)
+
+        for sub_path in sub_path_list:
+            yield from cls.walk_entry_of_path(
+                sub_path, is_recurse_subpath, matcher, match_type, is_recurse_subpath_all_file
+            )
 
     @classmethod
     def find_file_or_subpath_of_path(cls, path: str, match_str: str, match_type: int = MatchType_Common) -> bool:
@@ -240,8 +554,11 @@ class CFile:
             Returns:
                 是否存在匹配文件
         """
-        list_files = cls.file_or_subpath_of_path(path, match_str, match_type)
-        return len(list_files) > 0
+        matcher = CFileMatcher.of(match_str, match_type)
+        for entry in cls.entry_of_path(path):
+            if matcher.match(entry.name):
+                return True
+        return False
 
     @classmethod
     def join_file(cls, path: str, *paths: AnyStr) -> str:
@@ -334,8 +651,16 @@ class CFile:
         Returns: 当前目录下的文件
 
         """
-        for i in glob.glob(os.path.join(root_path, match_text)):
-            yield i
+        if isinstance(match_text, str):
+            for i in glob.glob(os.path.join(root_path, match_text)):
+                yield i
+        else:
+            # 匹配器或匹配字符列表, 仅对当前目录下的名称进行匹配
+            matcher = CFileMatcher.of(match_text)
+            with os.scandir(root_path) as dir_iterator:
+                matched_list = [dir_entry.path for dir_entry in dir_iterator if matcher.match(dir_entry.name)]
+            for i in matched_list:
+                yield i
 
     @classmethod
     def __find_all_matched_files(cls, root_path, match_text='*.*'):
@@ -348,13 +673,15 @@ class CFile:
         Returns: 当前目录下以及子目录的文件
 
         """
-        for name in os.listdir(root_path):
-            if os.path.isdir(os.path.join(root_path, name)):
-                try:
-                    for i in cls.__find_all_matched_files(os.path.join(root_path, name), match_text):
-                        yield i
-                except:
-                    pass
+        with os.scandir(root_path) as dir_iterator:
+            sub_path_list = [dir_entry.path for dir_entry in dir_iterator if dir_entry.is_dir()]
+
+        for sub_path in sub_path_list:
+            try:
+                for i in cls.__find_all_matched_files(sub_path, match_text):
+                    yield i
+            except:
+                pass
 
         for i in cls.__find_matched_files(root_path, match_text):
             yield i
@@ -365,7 +692,7 @@ class CFile:
 
         Args:
             root_path: 文件夹路径
-            match_text: 匹配字符
+            match_text: 匹配字符, 字符串按glob规则匹配, 也可以是匹配字符列表或CFileMatcher匹配器
             recurse: 是否删除子目录中的文件
 
         Returns: 无
@@ -629,11 +956,7 @@ class CFile:
         if CUtils.equal_ignore_case(file_name_with_path, None):
             return True
 
-        for pattern in pattern_list:
-            if fnmatch(file_name_with_path, pattern):
-                return True
-
-        return False
+        return CFileMatcher.of(pattern_list).match(file_name_with_path)
 
     @classmethod
     def split(cls, p: AnyStr):
@@ -684,6 +1007,74 @@ class CFile:
 
         """
         identify_result = chardet.detect(text)
+        return cls.__identify_result_encoding(identify_result, default_encoding)
+
+    @classmethod
+    def identify_file_encoding(cls, file_name_with_path: str, default_encoding='UTF-8',
+                               max_detect_size: int = None, use_cache: bool = True):
+        """增量识别文件的编码格式, 不需要将文件全部读入内存
+
+        1. 按块读取文件并送入chardet的UniversalDetector, 识别器对结果有足够的置信度(done)后立即结束读取
+        2. 全是英文与数字的内容无法得出确定的结论, 将继续向后识别, 直至出现中文等字符或达到max_detect_size
+        3. 识别结果缓存在file_encoding_cache中, 文件的大小和修改时间未变化时不再重复识别
+
+        Args:
+            file_name_with_path:文件路径
+            default_encoding:默认的编码格式
+            max_detect_size:最多识别的字节数, 为None时使用encoding_detect_Maximum_size
+            use_cache:是否使用识别结果缓存
+
+        Returns:
+            str: 识别出的编码格式
+
+        """
+        if max_detect_size is None:
+            max_detect_size = cls.encoding_detect_Maximum_size
+
+        long_file_name_with_path = cls.compatible_long_path(file_name_with_path)
+        cache_key = None
+        if use_cache:
+            file_stat = os.stat(long_file_name_with_path)
+            cache_key = (
+                os.path.abspath(long_file_name_with_path), file_stat.st_size, file_stat.st_mtime_ns, max_detect_size
+            )
+            identify_result = cls.file_encoding_cache.get(cache_key)
+            if identify_result is not None:
+                return cls.__identify_result_encoding(identify_result, default_encoding)
+
+        identify_result = cls.__identify_file_encoding(long_file_name_with_path, max_detect_size)
+        if cache_key is not None:
+            cls.file_encoding_cache.put(cache_key, identify_result)
+        return cls.__identify_result_encoding(identify_result, default_encoding)
+
+    @classmethod
+    def __identify_file_encoding(cls, file_name_with_path: str, max_detect_size: int) -> dict:
+        """私有方法：使用UniversalDetector增量识别文件的编码格式
+
+        Args:
+            file_name_with_path:文件路径(已处理长路径)
+            max_detect_size:最多识别的字节数
+
+        Returns:
+            dict: chardet的识别结果
+
+        """
+        detector = UniversalDetector()
+        detect_size = 0
+        with open(file_name_with_path, 'rb') as f:
+            while detect_size < max_detect_size:
+                chunk = f.read(cls.file_read_chunk_size)
+                if not chunk:
+                    break
+                detector.feed(chunk)
+                detect_size = detect_size + len(chunk)
+                if detector.done:
+                    break
+        detector.close()
+        return {'encoding': detector.result['encoding'], 'confidence': detector.result['confidence']}
+
+    @classmethod
+    def __identify_result_encoding(cls, identify_result, default_encoding):
         identify_encoding = identify_result['encoding']
         # identify_probability = identify_result['confidence'] # 成功概率
         # 由于windows系统的编码有可能是Windows-1254,打印出来后还是乱码,所以不直接用UTF-8编码
@@ -709,26 +1100,13 @@ class CFile:
         if not cls.file_or_path_exist(file_name_with_path):
             return ''
 
-        f = open(cls.compatible_long_path(file_name_with_path), "rb")
-        try:
-            txt = f.read()
-            if encoding is None:
-                if len(txt) < 1000:
-                    rt_encoding = cls.identify_encoding(txt)
-                else:
-                    rt_encoding = cls.identify_encoding(txt[:1000])
-                    # 检查到前1000字符全是英文与数字, 识别为ascii, 但是后面字符存在中文, 导致中文缺失的情况, 因此扩展检查到1万字符
-                    if CUtils.equal_ignore_case(rt_encoding, 'ascii'):
-                        if len(txt) < 10000:
-                            rt_encoding = cls.identify_encoding(txt)
-                        else:
-                            rt_encoding = cls.identify_encoding(txt[:10000])
-            else:
-                rt_encoding = encoding
-            true_txt = txt.decode(rt_encoding, "ignore")
-            return true_txt
-        finally:
-            f.close()
+        if encoding is None:
+            rt_encoding = cls.identify_file_encoding(file_name_with_path)
+        else:
+            rt_encoding = encoding
+
+        with open(cls.compatible_long_path(file_name_with_path), "rb") as f:
+            return f.read().decode(rt_encoding, "ignore")
 
     @classmethod
     def str_2_file(cls, str_info: str, file_name_with_path: str, encoding_type='utf-8'):
@@ -770,58 +1148,73 @@ class CFile:
         if not cls.file_or_path_exist(file_name_with_path):
             return None
 
-        result = []
-        f = open(file_name_with_path, "rb")
-        try:
-            txt_tem = f.read(1000)
-            encoding = CFile.identify_encoding(txt_tem)
-            f.seek(0)
-            txt_list = f.readlines()
-            for index, txt in enumerate(txt_list):
-                txt = txt.decode(encoding, "ignore")
-                result.append(CUtils.any_2_str(txt))
-            return result
-        finally:
-            f.close()
+        return list(cls.iter_file_2_list(file_name_with_path))
 
     @classmethod
-    def __file_or_dir_fullname_of_path_recurse(
-            cls, result_file_fullname_list: [], path: str,
-            is_recurse_subpath: bool = False, match_str: str = '*',
-            match_type: int = MatchType_Common, is_recurse_subpath_all_file: bool = False):
-        """私有方法，递归路径获取路径下的所有文件和文件夹的全文件名，仅供内部函数file_or_dir_fullname_of_path调用
+    def iter_file_2_str(cls, file_name_with_path: str, encoding=None):
+        """file_2_str的迭代器版本, 按块读取并增量解码, 逐块返回文本, 内存占用与文件大小无关
+
+        1. 多字节字符跨块时由增量解码器拼接, 不会被截断
+        2. 无法解码的字符将被忽略
 
         Args:
-            result_file_fullname_list:结果文件列表，为文件全民
-            path:文件路径
-            is_recurse_subpath:是否匹配子路径（只能匹配父目录已匹配的子目录）
-            match_str:匹配字符串
-            match_type:匹配类型
-            is_recurse_subpath_all_file:是否匹配子路径（全部匹配）
+            file_name_with_path:文件路径
+            encoding:默认的编码格式, 为None时自动识别
 
         Returns:
-            无返回内容
+            文本块的迭代器
 
         """
-        list_file_name = cls.file_or_subpath_of_path(path, match_str, match_type)
-        for file_name_temp in list_file_name:
-            file_fullname_temp = cls.join_file(path, file_name_temp)
-            result_file_fullname_list.append(file_fullname_temp)
-            if is_recurse_subpath:
-                if cls.is_dir(file_fullname_temp):
-                    cls.__file_or_dir_fullname_of_path_recurse(
-                        result_file_fullname_list, file_fullname_temp, is_recurse_subpath, match_str, match_type
-                    )
+        if not cls.file_or_path_exist(file_name_with_path):
+            return
 
-        if is_recurse_subpath_all_file and (not is_recurse_subpath):
-            list_all_file_name = cls.file_or_subpath_of_path(path)
-            for all_file_name_temp in list_all_file_name:
-                all_file_fullname_temp = cls.join_file(path, all_file_name_temp)
-                if cls.is_dir(all_file_fullname_temp):
-                    cls.__file_or_dir_fullname_of_path_recurse(
-                        result_file_fullname_list, all_file_fullname_temp,
-                        is_recurse_subpath, match_str, match_type, is_recurse_subpath_all_file
-                    )
+        if encoding is None:
+            encoding = cls.identify_file_encoding(file_name_with_path)
+
+        decoder = codecs.getincrementaldecoder(encoding)("ignore")
+        with open(cls.compatible_long_path(file_name_with_path), "rb") as f:
+            while True:
+                chunk = f.read(cls.file_read_chunk_size)
+                text = decoder.decode(chunk, not chunk)
+                if text != '':
+                    yield text
+                if not chunk:
+                    break
+
+    @classmethod
+    def iter_file_2_list(cls, file_name_with_path: str, encoding=None):
+        """file_2_list的迭代器版本, 按块读取并增量解码, 逐行返回, 内存占用与文件大小无关
+
+        1. 每行保留行尾的换行符, 与file_2_list一致
+        2. 无法解码的字符将被忽略
+
+        Args:
+            file_name_with_path:文件路径
+            encoding:默认的编码格式, 为None时自动识别
+
+        Returns:
+            逐行文本的迭代器
+
+        """
+        if not cls.file_or_path_exist(file_name_with_path):
+            return
+
+        # 尚未遇到换行符的行片段
+        line_part_list = []
+        for text in cls.iter_file_2_str(file_name_with_path, encoding):
+            line_list = text.split('\n')
+            if len(line_list) > 1:
+                line_part_list.append(line_list[0])
+                yield '{0}\n'.format(''.join(line_part_list))
+                for line in line_list[1:-1]:
+                    yield '{0}\n'.format(line)
+                line_part_list = [line_list[-1]]
+            else:
+                line_part_list.append(text)
+
+        last_line = ''.join(line_part_list)
+        if last_line != '':
+            yield last_line
 
     @classmethod
     def file_or_dir_fullname_of_path(cls, path: str, is_recurse_subpath: bool = False, match_str: str = '*',
@@ -840,24 +1233,38 @@ class CFile:
             匹配到的文件列表
 
         """
-        list_file_fullname = []
-        if cls.is_dir(path):
-            cls.__file_or_dir_fullname_of_path_recurse(
-                list_file_fullname, path, is_recurse_subpath, match_str, match_type, is_recurse_subpath_all_file
+        return list(
+            cls.iter_file_or_dir_fullname_of_path(
+                path, is_recurse_subpath, match_str, match_type, is_recurse_subpath_all_file
             )
-        return list_file_fullname
-
-    @classmethod
-    def __stat_of_path(
-            cls,
-            path: str,
-            is_recurse_subpath: bool,
-            match_str: str,
-            match_type: int,
-            sub_dir_count: int,
-            file_count: int,
-            file_size_sum: int
-    ):
+        )
+
+    @classmethod
+    def iter_file_or_dir_fullname_of_path(cls, path: str, is_recurse_subpath: bool = False, match_str: str = '*',
+                                          match_type: int = MatchType_Common,
+                                          is_recurse_subpath_all_file: bool = False):
+        """file_or_dir_fullname_of_path的迭代器版本, 边扫描边返回, 可随时中止
+
+        Args:
+            path: 扫描的目录
+            is_recurse_subpath: 是否递归子目录（只能匹配父目录已匹配的子目录）
+            match_str:匹配字符串
+            match_type:匹配类型
+            is_recurse_subpath_all_file:是否匹配子路径（全部匹配）
+
+        Returns:
+            匹配到的文件全名的迭代器
+
+        """
+        if not cls.is_dir(path):
+            return
+
+        for entry in cls.walk_entry_of_path(path, is_recurse_subpath, match_str, match_type,
+                                            is_recurse_subpath_all_file):
+            yield entry.file_name_with_path
+
+    @classmethod
+    def __stat_of_path(cls, path: str, is_recurse_subpath: bool, match_str: str, match_type: int):
         """私有方法：根据路径获取路径下的统计信息，根据参数is_recurse_subpath支持是否递归子目录
 
         Args:
@@ -875,39 +1282,32 @@ class CFile:
                 3. 文件总大小
 
         """
-        result_sub_dir_count = sub_dir_count
-        result_file_count = file_count
-        result_file_size_sum = file_size_sum
-        list_file_name = cls.file_or_subpath_of_path(path, match_str, match_type)
-        for file_name_temp in list_file_name:
-            file_fullname_temp = cls.join_file(path, file_name_temp)
-            if cls.is_file(file_fullname_temp):
+        result_sub_dir_count = 0
+        result_file_count = 0
+        result_file_size_sum = 0
+        for entry in cls.walk_entry_of_path(path, is_recurse_subpath, match_str, match_type):
+            if entry.is_file:
                 result_file_count = result_file_count + 1
-                result_file_size_sum = result_file_size_sum + cls.file_size(file_fullname_temp)
+                result_file_size_sum = result_file_size_sum + entry.size
             else:
                 result_sub_dir_count = result_sub_dir_count + 1
-                if is_recurse_subpath:
-                    result_sub_dir_count, result_file_count, result_file_size_sum = cls.__stat_of_path(
-                        file_fullname_temp,
-                        is_recurse_subpath,
-                        match_str,
-                        match_type,
-                        result_sub_dir_count,
-                        result_file_count,
-                        result_file_size_sum
-                    )
         return result_sub_dir_count, result_file_count, result_file_size_sum
 
     @classmethod
     def stat_of_path(cls, path: str, is_recurse_subpath: bool = False, match_str: str = '*',
-                     match_type: int = MatchType_Common):
+                     match_type: int = MatchType_Common, max_workers: int = 1, max_depth: int = None):
         """公共方法：根据路径获取路径下的统计信息，根据参数is_recurse_subpath支持是否递归子目录
 
+        1. max_workers大于1时, 子目录的扫描将分发到线程池中并行执行, 适用于NAS/NFS等高延迟的文件系统
+        2. 并行与串行的统计结果完全一致
+
         Args:
             path: 扫描的目录
             is_recurse_subpath: 是否递归子目录
             match_str:匹配字符串
             match_type:匹配类型
+            max_workers:并行扫描的线程数, 1表示串行扫描
+            max_depth:最大递归深度, None表示不限制, 0表示只统计当前目录
 
         Returns:
 
@@ -918,11 +1318,135 @@ class CFile:
                 3. 文件总大小
 
         """
-        if cls.is_dir(path):
-            return cls.__stat_of_path(path, is_recurse_subpath, match_str, match_type, 0, 0, 0)
-        else:
+        if not cls.is_dir(path):
             return 0, 1, cls.file_size(path)
 
+        if (max_workers is None or max_workers <= 1) and max_depth is None:
+            return cls.__stat_of_path(path, is_recurse_subpath, match_str, match_type)
+
+        result_sub_dir_count = 0
+        result_file_count = 0
+        result_file_size_sum = 0
+        stat_dict = cls.stat_of_path_by_subpath(
+            path, is_recurse_subpath, match_str, match_type, max_workers, max_depth
+        )
+        for sub_dir_count, file_count, file_size_sum in stat_dict.values():
+            result_sub_dir_count = result_sub_dir_count + sub_dir_count
+            result_file_count = result_file_count + file_count
+            result_file_size_sum = result_file_size_sum + file_size_sum
+        return result_sub_dir_count, result_file_count, result_file_size_sum
+
+    @classmethod
+    def stat_of_path_by_subpath(cls, path: str, is_recurse_subpath: bool = True, match_str: str = '*',
+                                match_type: int = MatchType_Common, max_workers: int = 1,
+                                max_depth: int = None) -> dict:
+        """公共方法：根据路径获取路径下按一级子目录分组的统计信息
+
+        1. 每个目录作为一个扫描任务, 空闲线程从共享的任务队列中领取待扫描的目录, 子目录扫描完毕后再派生新的任务
+        2. 各分组的统计信息之和, 与stat_of_path的统计结果一致
+
+        Args:
+            path: 扫描的目录
+            is_recurse_subpath: 是否递归子目录
+            match_str:匹配字符串
+            match_type:匹配类型
+            max_workers:并行扫描的线程数, 1表示串行扫描
+            max_depth:最大递归深度, None表示不限制, 0表示只统计当前目录
+
+        Returns:
+            统计信息字典, key为分组的目录全名, value为(子目录个数, 文件个数, 文件总大小)
+
+            1. path自身的分组, 统计的是path下一级的文件和子目录
+            2. 每个匹配的一级子目录的分组, 统计的是该子目录下全部的文件和子目录
+
+        """
+        if not cls.is_dir(path):
+            return {path: (0, 1, cls.file_size(path))}
+
+        matcher = CFileMatcher.of(match_str, match_type)
+        stat_dict = dict()
+        sub_dir_count, file_count, file_size_sum, sub_path_list = cls.__stat_of_dir(
+            path, matcher, match_type, is_recurse_subpath and cls.__depth_allowed(0, max_depth)
+        )
+        stat_dict[path] = [sub_dir_count, file_count, file_size_sum]
+        # 任务为: (待扫描的目录, 所属的分组, 目录深度)
+        task_list = []
+        for sub_path in sub_path_list:
+            stat_dict[sub_path] = [0, 0, 0]
+            task_list.append((sub_path, sub_path, 1))
+
+        if max_workers is None or max_workers <= 1:
+            while len(task_list) > 0:
+                sub_path, group_path, depth = task_list.pop()
+                stat_result = cls.__stat_of_dir(
+                    sub_path, matcher, match_type, cls.__depth_allowed(depth, max_depth)
+                )
+                cls.__stat_merge(stat_dict[group_path], stat_result)
+                task_list.extend([(next_path, group_path, depth + 1) for next_path in stat_result[3]])
+        else:
+            done_queue = queue.Queue()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                def submit(task):
+                    future = executor.submit(
+                        cls.__stat_of_dir, task[0], matcher, match_type, cls.__depth_allowed(task[2], max_depth)
+                    )
+                    future.add_done_callback(lambda done_future: done_queue.put((task, done_future)))
+
+                for task_item in task_list:
+                    submit(task_item)
+                pending_count = len(task_list)
+                while pending_count > 0:
+                    (sub_path, group_path, depth), future = done_queue.get()
+                    pending_count = pending_count - 1
+                    stat_result = future.result()
+                    cls.__stat_merge(stat_dict[group_path], stat_result)
+                    for next_path in stat_result[3]:
+                        submit((next_path, group_path, depth + 1))
+                        pending_count = pending_count + 1
+
+        return {group_path: tuple(stat_value) for group_path, stat_value in stat_dict.items()}
+
+    @classmethod
+    def __stat_of_dir(cls, path: str, match_str: str, match_type: int, is_recurse_subpath: bool):
+        """私有方法：统计一个目录下一级的匹配项, 并返回需要继续扫描的子目录
+
+        Args:
+            path: 扫描的目录
+            match_str:匹配字符串
+            match_type:匹配类型
+            is_recurse_subpath: 是否需要返回继续扫描的子目录
+
+        Returns:
+            子目录个数, 文件个数, 文件总大小, 需要继续扫描的子目录列表
+
+        """
+        sub_dir_count = 0
+        file_count = 0
+        file_size_sum = 0
+        sub_path_list = []
+        matcher = CFileMatcher.of(match_str, match_type)
+        for entry in cls.entry_of_path(path):
+            if not matcher.match(entry.name):
+                continue
+            if entry.is_file:
+                file_count = file_count + 1
+                file_size_sum = file_size_sum + entry.size
+            else:
+                sub_dir_count = sub_dir_count + 1
+                if is_recurse_subpath and entry.is_dir:
+                    sub_path_list.append(entry.file_name_with_path)
+        return sub_dir_count, file_count, file_size_sum, sub_path_list
+
+    @classmethod
+    def __stat_merge(cls, stat_value: list, stat_result):
+        stat_value[0] = stat_value[0] + stat_result[0]
+        stat_value[1] = stat_value[1] + stat_result[1]
+        stat_value[2] = stat_value[2] + stat_result[2]
+
+    @classmethod
+    def __depth_allowed(cls, depth: int, max_depth: int) -> bool:
+        return max_depth is None or depth < max_depth
+
     @classmethod
     def copy_file_to(cls, file_name_with_path: str, target_path: str):
         """复制文件到指定路径下
@@ -944,38 +1468,252 @@ class CFile:
                 # 在linux中，存在无操作权限的情况， 因此重构部分复制方法
                 if cls.is_dir(target_path):
                     target_path = cls.join_file(target_path, cls.file_name(file_name_with_path))
-                shutil.copyfile(cls.compatible_long_path(file_name_with_path), cls.compatible_long_path(target_path))
-                # noinspection PyBroadException
-                try:
-                    shutil.copymode(
-                        cls.compatible_long_path(file_name_with_path), cls.compatible_long_path(target_path)
-                    )
-                except Exception:
-                    pass
+                cls.__copy_file_data(
+                    cls.compatible_long_path(file_name_with_path), cls.compatible_long_path(target_path)
+                )
 
     @classmethod
-    def copy_path_to(cls, source_path: str, target_path: str):
+    def copy_path_to(cls, source_path: str, target_path: str, max_workers: int = 1):
         """复制文件夹到指定路径下
 
         Args:
             source_path: 文件夹路径
             target_path: 目标路径
+            max_workers: 并行复制的线程数, 1表示串行复制
 
         Returns: 无返回内容
 
+        Raises:
+            复制失败时抛出异常: 串行复制时在第一个失败的文件处中断, 并行复制时在全部完成后抛出第一个异常;
+            需要逐个记录失败文件而不中断时, 使用bulk_copy_path_to
+
         """
+        cls.__bulk_transfer_path_to(source_path, target_path, max_workers, False, True)
+
+    @classmethod
+    def bulk_copy_path_to(cls, source_path: str, target_path: str, max_workers: int = 8):
+        """批量复制文件夹到指定路径下
+
+        1. 每个目标目录只创建一次, 不再对每个文件检查和创建目录
+        2. 文件在线程池中并行复制, 在linux中使用os.copy_file_range/os.sendfile在内核中直接复制数据
+        3. 单个文件复制失败不会中断整体复制, 失败的文件以相对路径记录在错误文件列表中
+
+        Args:
+            source_path: 文件夹路径
+            target_path: 目标路径
+            max_workers: 并行复制的线程数, 1表示串行复制
+
+        Returns:
+            1. 是否完全正常复制: True/False
+            2. 如果是错误, 则返回错误的文件列表, 是一个list
+            3. 复制统计信息, 是一个dict, 包括文件个数(file_count), 文件总大小(file_size_sum),
+                耗时秒数(seconds)和吞吐量(bytes_per_second)
+
+        """
+        return cls.__bulk_transfer_path_to(source_path, target_path, max_workers, False)
+
+    @classmethod
+    def __bulk_transfer_path_to(cls, source_path: str, target_path: str, max_workers: int, remove_source: bool,
+                                raise_error: bool = False):
+        """私有方法：批量复制或移动文件夹下的文件到指定路径下, 供bulk_copy_path_to和跨设备移动调用
+
+        Args:
+            source_path: 文件夹路径
+            target_path: 目标路径
+            max_workers: 并行复制的线程数, 1表示串行复制
+            remove_source: 复制成功后是否删除源文件(同时保留源文件的时间等属性); 此时与同一设备上的重命名一致,
+                空目录同样在目标中创建, 符号链接按链接本身移动
+            raise_error: 复制失败时是否抛出异常(供copy_path_to调用), 否则只记录在错误文件列表中
+
+        Returns:
+            与bulk_copy_path_to一致
+
+        """
+        failure_list = []
+        error_list = []
+        copy_stat = {'file_count': 0, 'file_size_sum': 0, 'seconds': 0, 'bytes_per_second': 0}
+        stat_lock = threading.Lock()
+
         if not os.path.exists(target_path):
             os.makedirs(target_path)
 
+        def copy_one(src_file, dst_file, relation_file):
+            # noinspection PyBroadException
+            try:
+                file_size = cls.__copy_file_data(src_file, dst_file, remove_source)
+                if remove_source:
+                    os.remove(src_file)
+                with stat_lock:
+                    copy_stat['file_count'] = copy_stat['file_count'] + 1
+                    copy_stat['file_size_sum'] = copy_stat['file_size_sum'] + file_size
+            except Exception as error:
+                with stat_lock:
+                    failure_list.append(relation_file)
+                    error_list.append(error)
+                if raise_error and executor is None:
+                    raise
+
+        def move_link(src_link, dst_link, relation_file):
+            try:
+                os.symlink(os.readlink(src_link), dst_link)
+                os.remove(src_link)
+            except OSError as error:
+                with stat_lock:
+                    failure_list.append(relation_file)
+                    error_list.append(error)
+
+        start_time = time.time()
         if cls.file_or_path_exist(source_path):
-            # root 所指的是当前正在遍历的这个文件夹的本身的地址
-            # dirs 是一个 list，内容是该文件夹中所有的目录的名字(不包括子目录)
-            # files 同样是 list, 内容是该文件夹中所有的文件(不包括子目录)
-            for root, dirs, files in os.walk(source_path):
-                for file in files:
-                    src_file = cls.join_file(root, file)
-                    next_dir = cls.join_file(target_path, cls.file_relation_path(root, source_path))
-                    cls.copy_file_to(src_file, next_dir)
+            executor = None
+            task_semaphore = None
+            if max_workers is not None and max_workers > 1:
+                executor = ThreadPoolExecutor(max_workers=max_workers)
+                # 限制排队的任务个数, 避免超大目录树的任务全部堆积在内存中
+                task_semaphore = threading.BoundedSemaphore(max_workers * 4)
+            try:
+                for root, dirs, files in os.walk(source_path):
+                    if len(files) == 0 and not remove_source:
+                        continue
+                    relation_path = cls.file_relation_path(root, source_path)
+                    next_dir = cls.join_file(target_path, relation_path)
+                    if not cls.check_and_create_directory_itself(next_dir):
+                        if raise_error:
+                            raise PathNotCreateException(next_dir)
+                        if len(files) == 0:
+                            failure_list.append(relation_path)
+                        failure_list.extend([cls.join_file(relation_path, file) for file in files])
+                        continue
+                    if remove_source:
+                        # os.walk不进入指向目录的符号链接, 移动时按链接本身移动
+                        for sub_dir in dirs:
+                            src_dir = cls.join_file(root, sub_dir)
+                            if os.path.islink(src_dir):
+                                move_link(
+                                    src_dir, cls.join_file(next_dir, sub_dir), cls.join_file(relation_path, sub_dir)
+                                )
+                    for file in files:
+                        src_file = cls.compatible_long_path(cls.join_file(root, file))
+                        dst_file = cls.compatible_long_path(cls.join_file(next_dir, file))
+                        relation_file = cls.join_file(relation_path, file)
+                        if remove_source and os.path.islink(src_file):
+                            move_link(src_file, dst_file, relation_file)
+                        elif executor is None:
+                            copy_one(src_file, dst_file, relation_file)
+                        else:
+                            task_semaphore.acquire()
+                            future = executor.submit(copy_one, src_file, dst_file, relation_file)
+                            future.add_done_callback(lambda done_future: task_semaphore.release())
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=True)
+
+        if raise_error and len(error_list) > 0:
+            raise error_list[0]
+
+        copy_stat['seconds'] = time.time() - start_time
+        if copy_stat['seconds'] > 0:
+            copy_stat['bytes_per_second'] = copy_stat['file_size_sum'] / copy_stat['seconds']
+        return len(failure_list) == 0, failure_list, copy_stat
+
+    @classmethod
+    def __copy_file_data(cls, src_file: str, dst_file: str, keep_file_stat: bool = False) -> int:
+        """私有方法：复制文件内容和权限, 在linux中优先在内核中直接复制数据
+
+        Args:
+            src_file: 源文件路径(已处理长路径)
+            dst_file: 目标文件路径(已处理长路径)
+            keep_file_stat: 是否同时复制文件的时间等属性(与shutil.copy2一致), 否则只复制权限
+
+        Returns:
+            复制的字节数
+
+        Raises:
+            shutil.SameFileError: 源文件与目标文件是同一个文件(与shutil.copyfile一致), 避免以写方式打开时清空源文件
+
+        """
+        if COS.run_on_windows():
+            shutil.copyfile(src_file, dst_file)
+            file_size = os.path.getsize(src_file)
+        else:
+            if cls.__same_file(src_file, dst_file):
+                raise shutil.SameFileError('{0} and {1} are the same file'.format(src_file, dst_file))
+            with open(src_file, 'rb') as f_src, open(dst_file, 'wb') as f_dst:
+                file_size = cls.__zero_copy(f_src, f_dst)
+        # 在linux中，存在无操作权限的情况， 因此忽略权限复制的错误
+        # noinspection PyBroadException
+        try:
+            if keep_file_stat:
+                shutil.copystat(src_file, dst_file)
+            else:
+                shutil.copymode(src_file, dst_file)
+        except Exception:
+            pass
+        return file_size
+
+    @classmethod
+    def __same_file(cls, src_file: str, dst_file: str) -> bool:
+        """私有方法：判断源文件与目标文件是否是同一个文件(同一设备上的同一inode), 目标文件不存在时返回False
+
+        Args:
+            src_file: 源文件路径
+            dst_file: 目标文件路径
+
+        Returns:
+            是否是同一个文件
+
+        """
+        try:
+            return os.path.samefile(src_file, dst_file)
+        except OSError:
+            return False
+
+    @classmethod
+    def __zero_copy(cls, f_src, f_dst) -> int:
+        """私有方法：在内核中直接复制文件数据, 依次尝试os.copy_file_range, os.sendfile, 均不支持时使用常规读写
+
+        首次调用即返回0(空文件, 或文件系统不支持内核复制)时, 改用下一种方式, 空文件最终由常规读写确认
+
+        Args:
+            f_src: 源文件对象
+            f_dst: 目标文件对象
+
+        Returns:
+            复制的字节数
+
+        """
+        src_fd = f_src.fileno()
+        dst_fd = f_dst.fileno()
+        copied_size = 0
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while True:
+                    copied = os.copy_file_range(src_fd, dst_fd, cls.file_copy_chunk_size)
+                    if copied == 0:
+                        # 部分文件系统(如procfs, 部分FUSE和NFS)对非空文件也直接返回0, 首次即返回0时改用其他方式
+                        if copied_size == 0:
+                            break
+                        return copied_size
+                    copied_size = copied_size + copied
+            except OSError as error:
+                # 跨文件系统或文件系统不支持时, 在未复制任何数据的情况下改用其他方式
+                if copied_size > 0 or error.errno not in cls.__zero_copy_unsupported_errno_list:
+                    raise
+
+        if hasattr(os, 'sendfile'):
+            try:
+                while True:
+                    copied = os.sendfile(dst_fd, src_fd, copied_size, cls.file_copy_chunk_size)
+                    if copied == 0:
+                        if copied_size == 0:
+                            break
+                        return copied_size
+                    copied_size = copied_size + copied
+            except OSError as error:
+                if copied_size > 0 or error.errno not in cls.__zero_copy_unsupported_errno_list:
+                    raise
+
+        shutil.copyfileobj(f_src, f_dst, cls.file_read_chunk_size)
+        return f_dst.tell()
 
     @classmethod
     def move_file_to(cls, file_name_with_path: str, target_path: str, new_file_name=None) -> bool:
@@ -1015,6 +1753,181 @@ class CFile:
                 except:
                     return False
 
+    @classmethod
+    def resumable_copy_file_to(cls, file_name_with_path: str, target_path: str, new_file_name=None,
+                               verify: bool = False, hash_name: str = 'md5', chunk_size: int = None) -> bool:
+        """分块复制大文件到指定路径下, 复制中断后再次调用时从最后一个已校验的块继续复制
+
+        1. 数据先写入目标目录下的临时文件(目标文件名.part), 每复制完一个块, 将块的偏移、长度和哈希值追加到进度日志
+            (目标文件名.part.journal)中, 日志只记录已落盘的块
+        2. 继续复制时, 源文件的大小或修改时间与日志不一致则从头复制; 否则重新校验最后一个已记录的块, 从其后继续复制
+        3. verify为True时, 全部复制完成后流式读取临时文件, 逐块与日志中的哈希值比对, 不一致的块及其后的记录将被丢弃,
+            返回False, 再次调用时将重新复制这些块
+        4. 全部完成后, 临时文件原子重命名为目标文件, 并删除进度日志
+
+        Args:
+            file_name_with_path: 文件路径
+            target_path: 目标路径
+            new_file_name: 复制后的文件名称
+            verify: 是否在完成后校验临时文件
+            hash_name: 块哈希算法, 为hashlib支持的算法名称
+            chunk_size: 块大小, 为None时使用file_resume_chunk_size
+
+        Returns: 复制是否成功
+
+        """
+        if not cls.file_exist(file_name_with_path):
+            return False
+        if not cls.check_and_create_directory_itself(target_path):
+            return False
+
+        if chunk_size is None:
+            chunk_size = cls.file_resume_chunk_size
+
+        target_file_name = new_file_name
+        if target_file_name is None:
+            target_file_name = cls.file_name(file_name_with_path)
+        target_file_with_path = cls.compatible_long_path(cls.join_file(target_path, target_file_name))
+        src_file = cls.compatible_long_path(file_name_with_path)
+        part_file = '{0}.part'.format(target_file_with_path)
+        journal_file = '{0}.journal'.format(part_file)
+
+        src_stat = os.stat(src_file)
+        journal_header = '{0} {1} {2} {3}'.format(src_stat.st_size, src_stat.st_mtime_ns, chunk_size, hash_name)
+        chunk_list = cls.__resume_journal_load(journal_file, journal_header, part_file, hash_name)
+        if chunk_list is None:
+            chunk_list = []
+            with open(part_file, 'wb'):
+                pass
+            cls.__resume_journal_save(journal_file, journal_header, chunk_list)
+
+        copied_size = sum([chunk_length for chunk_offset, chunk_length, chunk_hash in chunk_list])
+        with open(src_file, 'rb') as f_src, open(part_file, 'r+b') as f_part, open(journal_file, 'a') as f_journal:
+            f_part.truncate(copied_size)
+            f_src.seek(copied_size)
+            f_part.seek(copied_size)
+            while True:
+                chunk = f_src.read(chunk_size)
+                if not chunk:
+                    break
+                f_part.write(chunk)
+                f_part.flush()
+                os.fsync(f_part.fileno())
+                chunk_hash = hashlib.new(hash_name, chunk).hexdigest()
+                f_journal.write('{0} {1} {2}\n'.format(copied_size, len(chunk), chunk_hash))
+                f_journal.flush()
+                os.fsync(f_journal.fileno())
+                chunk_list.append((copied_size, len(chunk), chunk_hash))
+                copied_size = copied_size + len(chunk)
+
+        if verify:
+            verified_count = cls.__resume_verify_count(part_file, chunk_list, hash_name)
+            if verified_count < len(chunk_list):
+                cls.__resume_journal_save(journal_file, journal_header, chunk_list[:verified_count])
+                return False
+
+        # noinspection PyBroadException
+        try:
+            shutil.copymode(src_file, part_file)
+        except Exception:
+            pass
+        os.replace(part_file, target_file_with_path)
+        os.remove(journal_file)
+        return cls.file_exist(target_file_with_path)
+
+    @classmethod
+    def resumable_move_file_to(cls, file_name_with_path: str, target_path: str, new_file_name=None,
+                               verify: bool = False, hash_name: str = 'md5') -> bool:
+        """移动大文件到指定路径下, 同一设备上直接重命名, 跨设备时使用可断点续传的分块复制, 完成后删除源文件
+
+        Args:
+            file_name_with_path: 文件路径
+            target_path: 目标路径
+            new_file_name: 移动后的文件名称
+            verify: 是否在复制完成后校验
+            hash_name: 块哈希算法
+
+        Returns: 移动是否成功
+
+        """
+        if not cls.file_exist(file_name_with_path):
+            return False
+        if not cls.check_and_create_directory_itself(target_path):
+            return False
+
+        if os.stat(cls.compatible_long_path(file_name_with_path)).st_dev == \
+                os.stat(cls.compatible_long_path(target_path)).st_dev:
+            return cls.move_file_to(file_name_with_path, target_path, new_file_name)
+
+        if not cls.resumable_copy_file_to(file_name_with_path, target_path, new_file_name, verify, hash_name):
+            return False
+        cls.remove_file(file_name_with_path)
+        return True
+
+    @classmethod
+    def __resume_journal_load(cls, journal_file: str, journal_header: str, part_file: str, hash_name: str):
+        """私有方法：加载进度日志, 并重新校验最后一个已记录的块
+
+        Returns:
+            已完成的块列表[(偏移, 长度, 哈希值)], 日志不存在或与源文件不一致时返回None
+
+        """
+        if not (os.path.exists(journal_file) and os.path.exists(part_file)):
+            return None
+
+        with open(journal_file, 'r') as f_journal:
+            line_list = f_journal.read().splitlines()
+        if len(line_list) == 0 or line_list[0] != journal_header:
+            return None
+
+        chunk_list = []
+        next_offset = 0
+        for line in line_list[1:]:
+            item_list = line.split(' ')
+            # 最后一行可能因中断而不完整
+            if len(item_list) != 3 or not (item_list[0].isdigit() and item_list[1].isdigit()):
+                break
+            chunk_offset = int(item_list[0])
+            chunk_length = int(item_list[1])
+            if chunk_offset != next_offset:
+                break
+            chunk_list.append((chunk_offset, chunk_length, item_list[2]))
+            next_offset = chunk_offset + chunk_length
+
+        if len(chunk_list) > 0:
+            if cls.__resume_verify_count(part_file, chunk_list[-1:], hash_name) == 0:
+                chunk_list.pop()
+        cls.__resume_journal_save(journal_file, journal_header, chunk_list)
+        return chunk_list
+
+    @classmethod
+    def __resume_journal_save(cls, journal_file: str, journal_header: str, chunk_list: list):
+        """私有方法：重写进度日志"""
+        with open(journal_file, 'w') as f_journal:
+            f_journal.write('{0}\n'.format(journal_header))
+            for chunk_offset, chunk_length, chunk_hash in chunk_list:
+                f_journal.write('{0} {1} {2}\n'.format(chunk_offset, chunk_length, chunk_hash))
+            f_journal.flush()
+            os.fsync(f_journal.fileno())
+
+    @classmethod
+    def __resume_verify_count(cls, part_file: str, chunk_list: list, hash_name: str) -> int:
+        """私有方法：流式读取临时文件, 依次校验块的哈希值
+
+        Returns:
+            从第一个块开始连续校验通过的块个数
+
+        """
+        verified_count = 0
+        with open(part_file, 'rb') as f_part:
+            for chunk_offset, chunk_length, chunk_hash in chunk_list:
+                f_part.seek(chunk_offset)
+                chunk = f_part.read(chunk_length)
+                if len(chunk) != chunk_length or hashlib.new(hash_name, chunk).hexdigest() != chunk_hash:
+                    break
+                verified_count = verified_count + 1
+        return verified_count
+
     @classmethod
     def make_tree_writable(cls, source_dir):
         """设置目录树的可读性
@@ -1082,13 +1995,18 @@ class CFile:
         return result, failure_list
 
     @classmethod
-    def move_subpath_and_file_of_path_to(cls, file_path: str, target_path: str):
+    def move_subpath_and_file_of_path_to(cls, file_path: str, target_path: str, max_workers: int = 1):
         """
         移动源目录下的子目录和文件, 至目标目录
 
+        1. 源目录与目标目录位于同一设备时, 目标中不存在的子目录将整体重命名, 只有同名的子目录才逐层合并
+        2. 跨设备时, 在线程池中逐个复制文件, 复制成功后删除源文件
+        3. 两种方式的结果一致: 空目录同样移动到目标中, 符号链接按链接本身移动, 不跟随
+
         Args:
             file_path: 文件路径
             target_path: 目标路径
+            max_workers: 跨设备移动时并行复制的线程数, 1表示串行复制
 
         Returns:
             1. 是否完全正常移动: True/False
@@ -1101,34 +2019,151 @@ class CFile:
             if not cls.check_and_create_directory_itself(target_path):
                 return False, failure_list
 
+        if cls.same_device(file_path, target_path):
+            # 先生成完整的移动计划再执行, 避免边扫描边移动导致目录项遗漏
+            move_plan_list = list(cls.__move_plan(file_path, file_path, target_path))
+            for src_file_or_path, dst_file_or_path, is_dir in move_plan_list:
+                try:
+                    os.rename(cls.compatible_long_path(src_file_or_path), cls.compatible_long_path(dst_file_or_path))
+                except OSError:
+                    if is_dir:
+                        cls.__move_file_of_path_to(src_file_or_path, file_path, target_path, failure_list)
+                    elif os.path.islink(src_file_or_path) or \
+                            not cls.move_file_to(src_file_or_path, cls.file_path(dst_file_or_path)):
+                        # 符号链接无法重命名时(如目标中已存在同名目录)视为失败, 与跨设备移动一致, 不移动到同名目录中
+                        failure_list.append(
+                            cls.join_file(
+                                cls.file_relation_path(cls.file_path(src_file_or_path), file_path),
+                                cls.file_name(src_file_or_path)
+                            )
+                        )
+        else:
+            result, failure_list, copy_stat = cls.__bulk_transfer_path_to(file_path, target_path, max_workers, True)
+
+        if len(failure_list) == 0:
+            sub_path_list = [
+                entry.file_name_with_path for entry in cls.entry_of_path(file_path) if cls.__entry_is_real_dir(entry)
+            ]
+            for sub_path_full_name in sub_path_list:
+                shutil.rmtree(CFile.compatible_long_path(sub_path_full_name))
+
+        return len(failure_list) == 0, failure_list
+
+    @classmethod
+    def same_device(cls, file_or_path: str, other_file_or_path: str) -> bool:
+        """
+        检查两个文件或目录是否位于同一设备(文件系统)上, 同一设备上的移动可以直接重命名
+
+        Args:
+            file_or_path: 文件路径
+            other_file_or_path: 另一个文件路径
+
+        Returns:
+            是否位于同一设备上
+
+        """
+        try:
+            return os.stat(cls.compatible_long_path(file_or_path)).st_dev == \
+                os.stat(cls.compatible_long_path(other_file_or_path)).st_dev
+        except OSError:
+            return False
+
+    @classmethod
+    def __move_plan(cls, root_path: str, file_path: str, target_path: str):
+        """
+        私有方法：生成同一设备上的移动计划
+
+        1. 目标中不存在的文件和子目录(包括空目录), 直接整体重命名
+        2. 目标中已存在的同名子目录, 继续生成其下级的移动计划
+        3. 符号链接(包括指向目录的符号链接)按链接本身移动, 不跟随
+
+        Args:
+            root_path: 移动的源根目录
+            file_path: 当前扫描的源目录
+            target_path: 当前的目标目录
+
+        Returns:
+            移动计划的迭代器, 每一项为(源文件或目录, 目标文件或目录, 是否为目录)
+
+        """
+        for entry in list(cls.entry_of_path(file_path)):
+            dst_file_or_path = cls.join_file(target_path, entry.name)
+            # 指向目录的符号链接按链接本身重命名, 不进入链接指向的目录合并其内容
+            if cls.__entry_is_real_dir(entry):
+                if cls.path_exist(dst_file_or_path):
+                    yield from cls.__move_plan(root_path, entry.file_name_with_path, dst_file_or_path)
+                else:
+                    yield entry.file_name_with_path, dst_file_or_path, True
+            else:
+                yield entry.file_name_with_path, dst_file_or_path, False
+
+    @classmethod
+    def __entry_is_real_dir(cls, entry: CFileEntry) -> bool:
+        """
+        私有方法：目录项是否为目录本身(不跟随符号链接)
+
+        Args:
+            entry: 目录项
+
+        Returns:
+            是否为目录, 指向目录的符号链接返回False
+
+        """
+        try:
+            return entry.dir_entry.is_dir(follow_symlinks=False)
+        except OSError:
+            return False
+
+    @classmethod
+    def __move_file_of_path_to(cls, file_path: str, root_path: str, target_path: str, failure_list: list):
+        """
+        私有方法：逐个移动目录下的文件, 用于目录无法整体重命名时
+
+        Args:
+            file_path: 需要移动的源目录
+            root_path: 移动的源根目录
+            target_path: 移动的目标根目录
+            failure_list: 错误的文件列表
+
+        Returns:
+            无
+
+        """
         for parent_path, sub_paths, sub_files in os.walk(file_path):
-            relation_path = cls.file_relation_path(parent_path, file_path)
+            relation_path = cls.file_relation_path(parent_path, root_path)
             for sub_file in sub_files:
                 src_file = cls.join_file(parent_path, sub_file)
                 if not cls.move_file_to(src_file, cls.join_file(target_path, relation_path)):
                     failure_list.append(cls.join_file(relation_path, sub_file))
 
-        if len(failure_list) == 0:
-            sub_path_list = cls.file_or_subpath_of_path(file_path)
-            for sub_path in sub_path_list:
-                sub_path_full_name = cls.join_file(file_path, sub_path)
-                if cls.is_dir(sub_path_full_name):
-                    shutil.rmtree(CFile.compatible_long_path(sub_path_full_name))
-
-        return len(failure_list) == 0, failure_list
-
     @classmethod
-    def file_locked(cls, file_name_with_path) -> bool:
+    def file_locked(cls, file_name_with_path, open_inode_set: set = None, probe_lock: bool = False) -> bool:
         """
         检查文件是否被其他应用打开和锁定
 
+        1. 在支持/proc的系统(linux)中, 通过其他进程打开的文件inode集合判断, 不对文件做任何修改
+        2. 在其他系统中, 通过对文件进行两次重命名来判断
+
         Args:
             file_name_with_path: 文件路径
+            open_inode_set: 已打开文件的inode集合, 为None时自动获取; 批量检查时应先用open_file_inode_set获取后传入
+            probe_lock: 在支持/proc的系统中, 是否同时使用fcntl探测文件上的锁
 
         Returns:
             文件是否被其他应用打开和锁定
 
         """
+        if cls.proc_fd_supported():
+            if open_inode_set is None:
+                open_inode_set = cls.open_file_inode_set()
+            try:
+                file_stat = os.stat(file_name_with_path)
+            except OSError:
+                return False
+            if (file_stat.st_dev, file_stat.st_ino) in open_inode_set:
+                return True
+            return probe_lock and cls.__file_lock_probe(file_name_with_path)
+
         try:
             cls.rename_file_or_dir(file_name_with_path, '{0}_file_locked_test'.format(file_name_with_path))
             cls.rename_file_or_dir('{0}_file_locked_test'.format(file_name_with_path), file_name_with_path)
@@ -1136,6 +2171,75 @@ class CFile:
         except PermissionError:
             return True
 
+    @classmethod
+    def proc_fd_supported(cls) -> bool:
+        """
+        检查当前系统是否可以通过/proc获取进程打开的文件
+
+        Returns:
+            是否支持/proc/*/fd
+        """
+        return os.path.isdir('/proc/self/fd')
+
+    @classmethod
+    def open_file_inode_set(cls) -> set:
+        """
+        获取当前系统中其他进程打开的文件的inode集合
+
+        1. 扫描/proc/*/fd, 对每个文件描述符获取(st_dev, st_ino), 不包括当前进程
+        2. 无权限访问的进程将被忽略, 因此非root用户只能获取到同用户进程打开的文件
+
+        Returns:
+            (st_dev, st_ino)的集合
+        """
+        open_inode_set = set()
+        self_pid = str(os.getpid())
+        for pid_entry in cls.entry_of_path('/proc'):
+            if (not pid_entry.name.isdigit()) or (pid_entry.name == self_pid):
+                continue
+            fd_path = '{0}/fd'.format(pid_entry.file_name_with_path)
+            try:
+                fd_list = os.listdir(fd_path)
+            except OSError:
+                continue
+            for fd in fd_list:
+                try:
+                    fd_stat = os.stat('{0}/{1}'.format(fd_path, fd))
+                except OSError:
+                    continue
+                if stat.S_ISREG(fd_stat.st_mode):
+                    open_inode_set.add((fd_stat.st_dev, fd_stat.st_ino))
+        return open_inode_set
+
+    @classmethod
+    def __file_lock_probe(cls, file_name_with_path) -> bool:
+        """
+        私有方法：使用fcntl.flock非阻塞地探测文件上是否存在其他进程的排他锁
+
+        Args:
+            file_name_with_path: 文件路径
+
+        Returns:
+            文件是否被锁定
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            fd = os.open(file_name_with_path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return False
+        except OSError:
+            return True
+        finally:
+            os.close(fd)
+
     @classmethod
     def access(cls, file_or_path) -> bool:
         """
@@ -1151,27 +2255,46 @@ class CFile:
         return os.access(file_or_path, os.F_OK)
 
     @classmethod
-    def find_locked_file_in_path(cls, file_path) -> list:
+    def find_locked_file_in_path(cls, file_path, max_workers: int = 1, probe_lock: bool = False) -> list:
         """
         检查文件夹下的子文件是否被其他应用打开和锁定
 
+        1. 在支持/proc的系统中, 仅获取一次已打开文件的inode集合, 每个文件只需一次stat查找
+        2. max_workers大于1时, 在线程池中并行检查, 返回结果的顺序与串行一致
+
         Args:
             file_path: 文件路径
+            max_workers: 并行检查的线程数, 1表示串行检查
+            probe_lock: 在支持/proc的系统中, 是否同时使用fcntl探测文件上的锁
 
         Returns:
-            文件夹下的子文件是否被其他应用打开和锁定
+            文件夹下被其他应用打开和锁定的子文件列表(相对路径)
 
         """
-        locked_file_list = []
+        open_inode_set = None
+        if cls.proc_fd_supported():
+            open_inode_set = cls.open_file_inode_set()
 
+        file_list = []
         for parent_path, sub_paths, sub_files in os.walk(file_path):
             relation_path = cls.file_relation_path(parent_path, file_path)
             for sub_file in sub_files:
-                src_file = cls.join_file(parent_path, sub_file)
-                if cls.file_locked(src_file):
-                    locked_file_list.append(cls.join_file(relation_path, sub_file))
+                file_list.append((cls.join_file(parent_path, sub_file), cls.join_file(relation_path, sub_file)))
+
+        def check_one(file_item):
+            return cls.file_locked(file_item[0], open_inode_set, probe_lock)
+
+        if max_workers > 1 and len(file_list) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                locked_flag_list = list(executor.map(check_one, file_list))
+        else:
+            locked_flag_list = [check_one(file_item) for file_item in file_list]
 
-        return locked_file_list
+        return [
+            relation_file
+            for (src_file, relation_file), locked_flag in zip(file_list, locked_flag_list)
+            if locked_flag
+        ]
 
     @classmethod
     def move_file_or_dir_to(cls, file_path: str, target_path: str):
@@ -1314,43 +2437,26 @@ class CFile:
         return dst.startswith(src)
 
     @classmethod
-    def __file_or_subpath_of_path_recurse(cls, result_file_fullname_list: [], path: str, match_str: str = '*',
-                                          match_type: int = MatchType_Common, full_path=False):
-        """私有方法，递归路径获取路径下的所有文件和文件夹的全文件名，仅供内部函数file_or_subpath_of_path_recurse调用
+    def file_or_subpath_of_path_recurse(cls, path: str, match_str: str = '*',
+                                        match_type: int = MatchType_Common, full_path=False):
+        """公共方法：根据路径递归子目录获取文件和文件夹的全文件名
 
         Args:
-            result_file_fullname_list:结果文件列表，为文件全民
-            path:文件路径
+            path: 扫描的目录
             match_str:匹配字符串
             match_type:匹配类型
             full_path:结果是否要为全路径
 
         Returns:
-            无返回内容
+            匹配到的文件列表
 
         """
-        if full_path:
-            file_main_name_with_ext = cls.file_or_subpath_of_path(path, match_str, match_type)
-            result_file_fullname_list.extend(
-                [CFile.join_file(path, file_name) for file_name in file_main_name_with_ext]
-            )
-        else:
-            result_file_fullname_list.extend(
-                cls.file_or_subpath_of_path(path, match_str, match_type)
-            )
-
-        list_all_file_name = cls.file_or_subpath_of_path(path)
-        for all_file_name_temp in list_all_file_name:
-            all_file_fullname_temp = cls.join_file(path, all_file_name_temp)
-            if cls.is_dir(all_file_fullname_temp):
-                cls.__file_or_subpath_of_path_recurse(
-                    result_file_fullname_list, all_file_fullname_temp, match_str, match_type, full_path
-                )
+        return list(cls.iter_file_or_subpath_of_path_recurse(path, match_str, match_type, full_path))
 
     @classmethod
-    def file_or_subpath_of_path_recurse(cls, path: str, match_str: str = '*',
-                                        match_type: int = MatchType_Common, full_path=False):
-        """公共方法：根据路径递归子目录获取文件和文件夹的全文件名
+    def iter_file_or_subpath_of_path_recurse(cls, path: str, match_str: str = '*',
+                                             match_type: int = MatchType_Common, full_path=False):
+        """file_or_subpath_of_path_recurse的迭代器版本, 边扫描边返回, 可随时中止
 
         Args:
             path: 扫描的目录
@@ -1359,13 +2465,17 @@ class CFile:
             full_path:结果是否要为全路径
 
         Returns:
-            匹配到的文件列表
+            匹配到的文件的迭代器
 
         """
-        list_file_fullname = []
-        if cls.is_dir(path):
-            cls.__file_or_subpath_of_path_recurse(list_file_fullname, path, match_str, match_type, full_path)
-        return list_file_fullname
+        if not cls.is_dir(path):
+            return
+
+        for entry in cls.walk_entry_of_path(path, False, match_str, match_type, True):
+            if full_path:
+                yield entry.file_name_with_path
+            else:
+                yield entry.name
 
     @classmethod
     def listdir(cls, path):
@@ -1407,19 +2517,17 @@ class CFile:
                 匹配到的文件
 
         """
+        matcher = CFileMatcher.of(match_str, match_type)
         extends_paths = []
         for path in path_list:
-            if cls.is_dir(path):
-                if cls.find_file_or_subpath_of_path(path, match_str, match_type):
-                    return cls.join_file(path, cls.file_or_subpath_of_path(path, match_str, match_type)[0])
-                else:
-                    next_names_with_path = cls.file_or_dir_fullname_of_path(path)
-                    for next_name_with_path in next_names_with_path:
-                        if cls.is_dir(next_name_with_path):
-                            extends_paths.append(next_name_with_path)
+            for entry in cls.entry_of_path(path):
+                if matcher.match(entry.name):
+                    return entry.file_name_with_path
+                if entry.is_dir:
+                    extends_paths.append(entry.file_name_with_path)
         if len(extends_paths) == 0:
             return None
-        return cls.__search_one(extends_paths, match_str, match_type)
+        return cls.__search_one(extends_paths, matcher, match_type)
 
     @classmethod
     def search_one(cls, path: str, match_str: str = '*', match_type: int = MatchType_Common):
@@ -1434,16 +2542,9 @@ class CFile:
                 匹配到的文件
 
         """
-        extends_paths = []
-        if cls.is_dir(path):
-            if cls.find_file_or_subpath_of_path(path, match_str, match_type):
-                return cls.join_file(path, cls.file_or_subpath_of_path(path, match_str, match_type)[0])
-            else:
-                next_names_with_path = cls.file_or_dir_fullname_of_path(path)
-                for next_name_with_path in next_names_with_path:
-                    if cls.is_dir(next_name_with_path):
-                        extends_paths.append(next_name_with_path)
-        return cls.__search_one(extends_paths, match_str, match_type)
+        if not cls.is_dir(path):
+            return None
+        return cls.__search_one([path], match_str, match_type)
 
     @classmethod
     def check_empty_dir(cls, path) -> bool:
@@ -1456,14 +2557,11 @@ class CFile:
                 是否为空文件夹
 
         """
-        sub_dir_list = cls.listdir(path)
-        for sub_dir in sub_dir_list:
-            sub_dir_full_path = cls.join_file(path, sub_dir)
-            if cls.is_dir(sub_dir_full_path):
-                empty_dir_flag = cls.check_empty_dir(sub_dir_full_path)
-                if not empty_dir_flag:
+        with os.scandir(cls.rollback_compatible_long_path(path)) as dir_iterator:
+            for dir_entry in dir_iterator:
+                if not dir_entry.is_dir():
+                    return False
+                if not cls.check_empty_dir(cls.join_file(path, dir_entry.name)):
                     return False
-            else:
-                return False
 
         return True
@@ -11,6 +11,15 @@
 
 from __future__ import absolute_import
 
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from functools import lru_cache
+from json import JSONDecoder, JSONDecodeError, dumps as std_json_dumps, loads as std_json_loads
+
 import demjson
 import jsonpath
 
@@ -19,11 +28,479 @@ from base.c_file import CFile
 from base.c_http import CHttp
 from base.c_utils import CUtils
 
-# noinspection PyBroadException
-try:
-    import ujson
-except Exception:
-    pass
+
+class CJsonBackend:
+    """
+    json编解码后端, 统一各个json包的loads/dumps接口, 并统计调用次数
+    1. dumps输出UTF-8字符(不转义为ascii), indent为0时输出紧凑格式
+    2. 调用次数只用于观察各后端的使用情况, 未加锁, 多线程下为近似值
+    """
+
+    def __init__(self, name: str, loads_func, dumps_func):
+        self.__name = name
+        self.__loads_func = loads_func
+        self.__dumps_func = dumps_func
+        self.loads_count = 0
+        self.dumps_count = 0
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    def loads(self, json_text: str):
+        """
+        解析json文本
+        :param json_text:
+        :return:
+        """
+        self.loads_count = self.loads_count + 1
+        return self.__loads_func(json_text)
+
+    def dumps(self, obj, indent: int = 0) -> str:
+        """
+        将对象序列化为json文本
+        :param obj:
+        :param indent:
+        :return:
+        """
+        self.dumps_count = self.dumps_count + 1
+        return self.__dumps_func(obj, indent)
+
+    def stat(self) -> dict:
+        """
+        调用次数统计
+        :return:
+        """
+        return {'loads_count': self.loads_count, 'dumps_count': self.dumps_count}
+
+
+def _json_default(obj):
+    """
+    标准json包和orjson无法直接序列化的对象的转换方法
+    :param obj:
+    :return:
+    """
+    if isinstance(obj, Decimal):
+        return CJson.decimal_2_number(obj)
+    raise TypeError('{0} is not JSON serializable'.format(type(obj).__name__))
+
+
+# 可以直接保留的json基本类型
+_json_scalar_type_set = frozenset({str, int, float, bool, type(None)})
+
+
+def _normalize_json_key(key) -> str:
+    """
+    按原ujson序列化的规则, 将字典的键转换为字符串: true, false, null以外的键(包括Decimal等)均使用str转换
+    :param key:
+    :return:
+    """
+    if isinstance(key, str):
+        return key
+    elif key is True:
+        return 'true'
+    elif key is False:
+        return 'false'
+    elif key is None:
+        return 'null'
+    else:
+        return str(key)
+
+
+def _normalize_json_obj(obj):
+    """
+    CJson.normalize_obj的实现, 优先按精确类型判断, 字典使用推导式生成, 减少每个元素的调用开销
+    :param obj:
+    :return:
+    """
+    obj_type = type(obj)
+    if obj_type is dict or (obj_type not in _json_scalar_type_set and isinstance(obj, dict)):
+        return {
+            (key if type(key) is str else _normalize_json_key(key)):
+                (value if type(value) in _json_scalar_type_set else _normalize_json_obj(value))
+            for key, value in obj.items()
+        }
+    elif obj_type is list or obj_type is tuple or isinstance(obj, (list, tuple)):
+        return [item if type(item) in _json_scalar_type_set else _normalize_json_obj(item) for item in obj]
+    elif obj_type in _json_scalar_type_set:
+        return obj
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    else:
+        raise TypeError('{0} is not JSON serializable'.format(obj_type.__name__))
+
+
+def _std_json_dumps(obj, indent: int = 0) -> str:
+    if indent:
+        return std_json_dumps(obj, ensure_ascii=False, indent=indent, default=_json_default)
+    return std_json_dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+# 19位以上的连续数字, 可能是超出orjson的64位整数范围的整数
+_json_long_digits_pattern = re.compile(r'\d{19}')
+
+
+def _lossless_json_loads():
+    """
+    获取可无损解析大整数的json解析方法, 优先使用ujson, 未安装时使用标准json包
+    :return:
+    """
+    try:
+        import ujson
+    except ImportError:
+        return std_json_loads
+    return ujson.loads
+
+
+def _create_json_backend(name: str):
+    """
+    创建指定名称的json编解码后端, 对应的包未安装时返回None
+    :param name:
+    :return:
+    """
+    if name == 'orjson':
+        try:
+            import orjson
+        except ImportError:
+            return None
+
+        def orjson_dumps(obj, indent: int = 0) -> str:
+            # orjson只支持缩进2个空格, 其他缩进使用标准json包
+            if indent not in (0, 2):
+                return _std_json_dumps(obj, indent)
+            option = orjson.OPT_NON_STR_KEYS
+            if indent == 2:
+                option = option | orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=_json_default, option=option).decode('utf-8')
+            except orjson.JSONEncodeError:
+                # 超出64位的整数等orjson无法序列化的内容, 使用标准json包
+                return _std_json_dumps(obj, indent)
+
+        lossless_loads = _lossless_json_loads()
+
+        def orjson_loads(json_text):
+            # orjson将超出64位的整数解析为float, 且不支持单独的代理字符转义和溢出为inf的数值,
+            # 存在19位以上的数字或orjson无法解析时, 使用可无损解析的json包
+            if isinstance(json_text, str) and _json_long_digits_pattern.search(json_text) is not None:
+                return lossless_loads(json_text)
+            try:
+                return orjson.loads(json_text)
+            except orjson.JSONDecodeError:
+                return lossless_loads(json_text)
+
+        return CJsonBackend(name, orjson_loads, orjson_dumps)
+    elif name == 'ujson':
+        try:
+            import ujson
+        except ImportError:
+            return None
+
+        def ujson_dumps(obj, indent: int = 0) -> str:
+            return ujson.dumps(obj, ensure_ascii=False, indent=indent)
+
+        return CJsonBackend(name, ujson.loads, ujson_dumps)
+    elif name == 'json':
+        return CJsonBackend(name, std_json_loads, _std_json_dumps)
+    elif name == 'demjson':
+        def demjson_dumps(obj, indent: int = 0) -> str:
+            return demjson.encode(obj)
+
+        return CJsonBackend(name, demjson.decode, demjson_dumps)
+    else:
+        return None
+
+
+def _create_json_backend_dict(backend_name_list: list) -> dict:
+    """
+    创建所有可用的json编解码后端
+    :param backend_name_list:
+    :return:
+    """
+    backend_dict = dict()
+    for backend_name in backend_name_list:
+        backend = _create_json_backend(backend_name)
+        if backend is not None:
+            backend_dict[backend_name] = backend
+    return backend_dict
+
+
+def _select_json_backend(backend_dict: dict, backend_priority: list) -> CJsonBackend:
+    """
+    按优先级选择第一个可用的json编解码后端, 标准json包总是可用的
+    :param backend_dict:
+    :param backend_priority:
+    :return:
+    """
+    for backend_name in backend_priority:
+        backend = backend_dict.get(backend_name)
+        if backend is not None:
+            return backend
+    return backend_dict['json']
+
+
+# 以单引号, 未加引号的键名或注释开头的文本, 一定不是标准的json, 可直接使用宽松的解析方式
+_lenient_json_prefix_pattern = re.compile(r'\s*(?:\{\s*[\'A-Za-z_$/]|\[\s*[\'/]|[\'/])')
+
+# 简单点分路径中每一级名称不能包含jsonpath的特殊字符
+_simple_json_path_segment_pattern = re.compile(r'^[^\[\]\'"()?@*,:;!#$.\s]+$')
+
+
+@lru_cache(maxsize=1024)
+def _compiled_json_path(query: str):
+    """
+    解析jsonpath查询语句
+    1. 简单的点分路径, 如application.log.level或$.application.log.level, 返回各级名称组成的tuple
+    2. 其他查询语句返回None, 仍由jsonpath进行通用查询
+    :param query:
+    :return:
+    """
+    path_str = query[2:] if query.startswith('$.') else query
+    segment_tuple = tuple(path_str.split('.'))
+    for segment in segment_tuple:
+        if _simple_json_path_segment_pattern.match(segment) is None:
+            return None
+        # 非ascii的数字字符无法按列表下标处理, 交由jsonpath处理
+        if segment.isdigit() and not segment.isascii():
+            return None
+    return segment_tuple
+
+
+class CJsonParseCache:
+    """
+    json文本解析结果缓存, 进程内共享, 线程安全
+    1. 以json文本为key, 相同的文本只解析一次
+    2. 同时按记录个数和文本总长度限制缓存, 超过任一限制后, 淘汰最久未使用的记录; 超过最大长度的文本不缓存
+    3. 缓存的解析结果是共享的, 使用者不能修改
+    4. 内存占用上限: 文本总长度不超过max_total_text_length个字符(按最宽的字符计算, 每个字符最多4字节),
+        解析结果的对象通常是文本大小的数倍; 按默认值, 文本最多约4M字符, 连同解析结果通常在几十MB以内
+    """
+
+    def __init__(self, max_size: int = 128, max_text_length: int = 64 * 1024,
+                 max_total_text_length: int = 4 * 1024 * 1024):
+        self.__lock = threading.Lock()
+        self.__cache = OrderedDict()
+        self.__max_size = max_size
+        self.__max_text_length = max_text_length
+        self.__max_total_text_length = max_total_text_length
+        self.__total_text_length = 0
+        self.__hit_count = 0
+        self.__miss_count = 0
+
+    def get(self, json_text: str):
+        """
+        获取缓存的解析结果, 不存在时返回None, 同时统计命中与未命中次数
+        :param json_text:
+        :return:
+        """
+        with self.__lock:
+            json_obj = self.__cache.get(json_text)
+            if json_obj is None:
+                self.__miss_count = self.__miss_count + 1
+            else:
+                self.__hit_count = self.__hit_count + 1
+                self.__cache.move_to_end(json_text)
+            return json_obj
+
+    def put(self, json_text: str, json_obj):
+        """
+        缓存解析结果
+        :param json_text:
+        :param json_obj:
+        :return:
+        """
+        if len(json_text) > self.__max_text_length:
+            return
+
+        with self.__lock:
+            if json_text not in self.__cache:
+                self.__total_text_length = self.__total_text_length + len(json_text)
+            self.__cache[json_text] = json_obj
+            self.__cache.move_to_end(json_text)
+            while len(self.__cache) > self.__max_size or self.__total_text_length > self.__max_total_text_length:
+                evict_text, evict_obj = self.__cache.popitem(last=False)
+                self.__total_text_length = self.__total_text_length - len(evict_text)
+
+    def clear(self):
+        """
+        清空缓存及统计信息
+        :return:
+        """
+        with self.__lock:
+            self.__cache.clear()
+            self.__total_text_length = 0
+            self.__hit_count = 0
+            self.__miss_count = 0
+
+    @property
+    def hit_count(self) -> int:
+        return self.__hit_count
+
+    @property
+    def miss_count(self) -> int:
+        return self.__miss_count
+
+    @property
+    def size(self) -> int:
+        return len(self.__cache)
+
+    @property
+    def total_text_length(self) -> int:
+        return self.__total_text_length
+
+
+class CJsonStreamReader:
+    """
+    json文本流读取器, 从文本块的迭代器中逐个解析json值
+    1. 只缓存尚未解析的文本, 内存占用只与单个值的大小有关, 与文本总长度无关
+    2. 可以定位到点分路径指定的节点, 并逐项读取其中的数组
+    """
+    __decoder = JSONDecoder()
+    # 空白字符, 包括文件开头可能存在的BOM
+    __whitespace_pattern = re.compile(r'[ \t\n\r\ufeff]*')
+
+    def __init__(self, text_iter):
+        self.__text_iter = iter(text_iter)
+        self.__buffer = ''
+        self.__pos = 0
+        self.__eof = False
+
+    def __fill(self, grow: bool = False) -> bool:
+        """
+        读取下一个文本块, 丢弃已解析的文本
+        :param grow: 是否至少读取与未解析文本等长的内容, 避免大的值被反复尝试解析
+        :return: 是否读取到了新的文本
+        """
+        if self.__eof:
+            return False
+
+        text_list = [self.__buffer[self.__pos:]]
+        min_length = len(text_list[0]) if grow else 1
+        read_length = 0
+        while read_length < min_length:
+            text = next(self.__text_iter, None)
+            if text is None:
+                self.__eof = True
+                break
+            text_list.append(text)
+            read_length = read_length + len(text)
+
+        self.__buffer = ''.join(text_list)
+        self.__pos = 0
+        return read_length > 0
+
+    def peek(self) -> str:
+        """
+        跳过空白字符, 返回下一个字符但不读取, 文本结束时返回空字符串
+        :return:
+        """
+        while True:
+            self.__pos = self.__whitespace_pattern.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                return ''
+
+    def read_char(self) -> str:
+        """
+        跳过空白字符, 读取下一个字符, 文本结束时返回空字符串
+        :return:
+        """
+        char = self.peek()
+        if char != '':
+            self.__pos = self.__pos + 1
+        return char
+
+    def read_value(self):
+        """
+        读取下一个完整的json值
+        :return:
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__pos)
+                # 数值可能被文本块截断, 只有其后还有字符或文本已结束时, 才认为解析完整
+                if end < len(self.__buffer) or self.__eof:
+                    self.__pos = end
+                    return value
+            except JSONDecodeError:
+                if self.__eof:
+                    raise
+            self.__fill(True)
+
+    def seek_path(self, segment_tuple: tuple) -> bool:
+        """
+        按点分路径的各级名称, 定位到指定节点的值之前, 其间不需要的值解析后即丢弃
+        :param segment_tuple:
+        :return: 节点是否存在
+        """
+        for segment in segment_tuple:
+            char = self.read_char()
+            if char == '{':
+                if not self.__seek_key(segment):
+                    return False
+            elif char == '[' and segment.isdigit():
+                if not self.__seek_index(int(segment)):
+                    return False
+            else:
+                return False
+        return True
+
+    def __seek_key(self, key: str) -> bool:
+        """
+        在对象中定位到指定名称的值之前
+        :param key:
+        :return:
+        """
+        if self.peek() == '}':
+            return False
+        while True:
+            name = self.read_value()
+            if self.read_char() != ':':
+                raise JSONDecodeError('Expecting \':\' delimiter', self.__buffer, self.__pos)
+            if name == key:
+                return True
+            self.read_value()
+            if self.read_char() != ',':
+                return False
+
+    def __seek_index(self, index: int) -> bool:
+        """
+        在数组中定位到指定下标的值之前
+        :param index:
+        :return:
+        """
+        if self.peek() == ']':
+            return False
+        for skip_index in range(index):
+            self.read_value()
+            if self.read_char() != ',':
+                return False
+        return True
+
+    def iter_items(self):
+        """
+        逐项读取当前位置的数组; 当前位置的值不是数组时, 作为唯一的一项返回
+        :return:
+        """
+        char = self.peek()
+        if char == '':
+            return
+        elif char != '[':
+            yield self.read_value()
+            return
+
+        self.read_char()
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.read_value()
+            char = self.read_char()
+            if char == ']':
+                return
+            elif char != ',':
+                raise JSONDecodeError('Expecting \',\' delimiter', self.__buffer, self.__pos)
 
 
 class CJson:
@@ -32,8 +509,30 @@ class CJson:
 
     __json_obj = None
 
-    # 使用ensure_ascii=false输出UTF-8
-    __ensure_ascii = False
+    Backend_OrJson = 'orjson'
+    Backend_UJson = 'ujson'
+    Backend_Json = 'json'
+    Backend_DemJson = 'demjson'
+    # 标准json的编解码后端, 导入时选择第一个可用的后端
+    # ujson与原实现一致, 可无损解析超出64位的整数, 优先使用; orjson需要先检查文本中的长数字, 整体并不更快
+    json_backend_priority = [Backend_UJson, Backend_OrJson, Backend_Json]
+    # 所有可用的编解码后端, demjson只用于解析非标准的json文本(如单引号, 尾部逗号), 以及序列化失败时的兜底
+    __json_backend_dict = _create_json_backend_dict(json_backend_priority + [Backend_DemJson])
+    __json_backend = _select_json_backend(__json_backend_dict, json_backend_priority)
+    __lenient_json_backend = __json_backend_dict[Backend_DemJson]
+    # 已确认不是标准json的文本, 记录(长度, 哈希值), 再次解析时直接使用宽松的解析方式
+    lenient_json_verdict_max_size = 1024
+    __lenient_json_verdict_lock = threading.Lock()
+    __lenient_json_verdict_dict = OrderedDict()
+
+    # json_path等类方法使用的文本解析缓存
+    json_parse_cache = CJsonParseCache()
+
+    # 流式写入文件时, 位于前几层或元素个数达到指定值的字典和列表, 将逐个元素序列化并写入
+    stream_container_depth = 2
+    stream_container_min_size = 256
+    # 写入文件时的缓冲区大小
+    file_write_buffer_size = 1024 * 1024
 
     def __init__(self):
         self.__json_obj = dict()
@@ -73,21 +572,73 @@ class CJson:
             elif rt_json_content == '':
                 rt_json_content = '{}'
 
+            if self.is_lenient_json(rt_json_content):
+                self.__json_obj = self.__lenient_loads(rt_json_content)
+                return
+
             # noinspection PyBroadException
             try:
-                self.__json_obj = ujson.loads(rt_json_content)
+                self.__json_obj = self.__json_backend.loads(rt_json_content)
             except Exception:
-                # 因为demjson包的接口较强, 所以使用demjson包进行字典转换
-                self.__json_obj = demjson.decode(rt_json_content)
-                # noinspection PyBroadException
-                try:
-                    # 因为demjson包转换出的字典存在Decimal函数字典, 无法序列化, 再用ujson转一遍
-                    self.__json_obj = ujson.loads(ujson.dumps(self.__json_obj, ensure_ascii=self.__ensure_ascii))
-                except Exception:
-                    pass
+                self.__mark_lenient_json(rt_json_content)
+                self.__json_obj = self.__lenient_loads(rt_json_content)
         else:
             self.load_obj(json_content)
 
+    @classmethod
+    def is_lenient_json(cls, json_text: str) -> bool:
+        """
+        不解析文本, 判断是否已知为非标准的json(如单引号, 未加引号的键名, 注释)
+        1. 根据文本开头的字符判断
+        2. 曾经按标准json解析失败的文本, 记录在缓存中
+        :param json_text:
+        :return:
+        """
+        if _lenient_json_prefix_pattern.match(json_text) is not None:
+            return True
+
+        verdict_key = (len(json_text), hash(json_text))
+        with cls.__lenient_json_verdict_lock:
+            if verdict_key in cls.__lenient_json_verdict_dict:
+                cls.__lenient_json_verdict_dict.move_to_end(verdict_key)
+                return True
+        return False
+
+    @classmethod
+    def __mark_lenient_json(cls, json_text: str):
+        """
+        记录按标准json解析失败的文本
+        :param json_text:
+        :return:
+        """
+        verdict_key = (len(json_text), hash(json_text))
+        with cls.__lenient_json_verdict_lock:
+            cls.__lenient_json_verdict_dict[verdict_key] = True
+            cls.__lenient_json_verdict_dict.move_to_end(verdict_key)
+            while len(cls.__lenient_json_verdict_dict) > cls.lenient_json_verdict_max_size:
+                cls.__lenient_json_verdict_dict.popitem(last=False)
+
+    @classmethod
+    def __lenient_loads(cls, json_text: str):
+        """
+        使用宽松的方式解析非标准的json文本
+        :param json_text:
+        :return:
+        """
+        # 因为demjson包的接口较强, 所以使用demjson包进行字典转换
+        json_obj = cls.__lenient_json_backend.loads(json_text)
+        # 因为demjson包转换出的字典存在Decimal函数字典, 无法序列化, 结构化转换一遍
+        try:
+            return cls.normalize_obj(json_obj)
+        except (TypeError, ValueError):
+            pass
+
+        # noinspection PyBroadException
+        try:
+            return cls.__json_backend.loads(cls.__json_backend.dumps(json_obj))
+        except Exception:
+            return json_obj
+
     def load_obj(self, obj):
         """
         通过给定的json内容, 对json对象进行初始化
@@ -95,17 +646,46 @@ class CJson:
         :return:
         """
         if CUtils.is_dict(obj):
-            # 稳定性保证
+            # 稳定性保证: 结构化遍历一次, 生成只包含json基本类型的副本, 与序列化再解析的结果一致
             # noinspection PyBroadException
             try:
-                temp_obj = ujson.dumps(obj, ensure_ascii=self.__ensure_ascii)
+                self.__json_obj = self.normalize_obj(obj)
+                return
+            except (TypeError, ValueError):
+                pass
+
+            # 存在无法直接转换的对象时, 仍使用序列化再解析的方式
+            # noinspection PyBroadException
+            try:
+                temp_obj = self.__json_backend.dumps(obj)
             except Exception:
-                temp_obj = demjson.encode(obj)
+                temp_obj = self.__lenient_json_backend.dumps(obj)
 
             self.load_json_text(temp_obj)
         else:
             self.load_json_text(CUtils.any_2_str(obj))
 
+    @classmethod
+    def normalize_obj(cls, obj):
+        """
+        将对象转换为只包含json基本类型的副本, 结果与序列化后再解析一致, 但不产生中间字符串
+        1. dict的键将转换为字符串, tuple将转换为list
+        2. Decimal将转换为float
+        3. 遇到其他无法转换的对象时, 抛出TypeError
+        :param obj:
+        :return:
+        """
+        return _normalize_json_obj(obj)
+
+    @classmethod
+    def decimal_2_number(cls, value: Decimal):
+        """
+        将Decimal转换为json的数值类型, 与原ujson序列化再解析一致, 均转换为float(整数值同样为float, 超出范围为inf)
+        :param value:
+        :return:
+        """
+        return float(value)
+
     @classmethod
     def from_obj(cls, obj):
         result = CJson()
@@ -118,6 +698,92 @@ class CJson:
             result.load_obj(obj)
         return result
 
+    @classmethod
+    def iter_file(cls, filename, item_path: str = None, item_filter: str = None, encoding=None):
+        """
+        逐项读取json文件中的数组, 适用于无法一次读入内存的大文件
+        1. item_path为数组节点的点分路径, 如features或$.data.features; 为None或空时, 文件本身应是数组
+        2. item_path对应的节点不是数组时, 作为唯一的一项返回; 节点不存在时, 不返回任何项
+        3. item_filter为对每一项执行的jsonpath查询, 只返回查询结果不为空的项
+        4. encoding为None时自动识别文件的编码格式(GBK/UTF-8等)
+        :param filename:
+        :param item_path:
+        :param item_filter:
+        :param encoding:
+        :return:
+        """
+        if not CFile.file_or_path_exist(filename):
+            return
+
+        if item_path is None or item_path in ('', '$'):
+            segment_tuple = ()
+        else:
+            segment_tuple = _compiled_json_path(item_path)
+            if segment_tuple is None:
+                raise Exception('数组节点路径[{0}]不是点分路径, 无法逐项读取! '.format(item_path))
+
+        reader = CJsonStreamReader(CFile.iter_file_2_str(filename, encoding))
+        if not reader.seek_path(segment_tuple):
+            return
+
+        for item in reader.iter_items():
+            if item_filter is None or len(cls.__xpath_of_obj(item, item_filter)) > 0:
+                yield item
+
+    @classmethod
+    def iter_ndjson(cls, filename, item_filter: str = None, encoding=None):
+        """
+        逐行读取NDJSON(每行一个json值)文件, 适用于无法一次读入内存的大文件
+        1. 空行将被忽略
+        2. item_filter为对每一项执行的jsonpath查询, 只返回查询结果不为空的项
+        3. encoding为None时自动识别文件的编码格式(GBK/UTF-8等)
+        :param filename:
+        :param item_filter:
+        :param encoding:
+        :return:
+        """
+        for line in CFile.iter_file_2_list(filename, encoding):
+            line = line.strip()
+            if line == '':
+                continue
+
+            json = CJson()
+            json.load_json_text(line)
+            item = json.json_obj
+            if item_filter is None or len(cls.__xpath_of_obj(item, item_filter)) > 0:
+                yield item
+
+    @classmethod
+    def json_backend(cls) -> CJsonBackend:
+        """
+        当前使用的标准json编解码后端
+        :return:
+        """
+        return cls.__json_backend
+
+    @classmethod
+    def set_json_backend(cls, backend_name: str):
+        """
+        指定使用的标准json编解码后端, 如orjson, ujson, json
+        :param backend_name:
+        :return:
+        """
+        backend = cls.__json_backend_dict.get(backend_name)
+        if backend is None or backend_name == cls.Backend_DemJson:
+            raise Exception('json编解码后端[{0}]不可用! '.format(backend_name))
+        CJson.__json_backend = backend
+
+    @classmethod
+    def json_backend_stat(cls) -> dict:
+        """
+        各编解码后端的调用次数统计, 其中demjson的调用次数即为解析非标准json文本及序列化失败的次数
+        :return:
+        """
+        return {
+            backend_name: backend.stat()
+            for backend_name, backend in cls.__json_backend_dict.items()
+        }
+
     @classmethod
     def from_url(cls, url):
         result = CJson()
@@ -133,38 +799,180 @@ class CJson:
     def to_json(self, indent=0) -> str:
         # noinspection PyBroadException
         try:
-            return ujson.dumps(self.__json_obj, ensure_ascii=self.__ensure_ascii, indent=indent)
+            return self.__json_backend.dumps(self.__json_obj, indent)
+        except Exception:
+            return self.__lenient_json_backend.dumps(self.__json_obj)
+
+    def to_file(self, filename, ndjson: bool = False):
+        """
+        将json对象写入文件
+        1. 逐个节点序列化并分块写入, 不需要先生成完整的json字符串
+        2. 先写入同目录下的临时文件, 完成后再替换目标文件, 写入失败时不会破坏已有的文件
+        3. ndjson为True且json对象是列表时, 按NDJSON格式每行写入一项
+        :param filename:
+        :param ndjson:
+        :return:
+        """
+        if not CFile.check_and_create_directory(filename):
+            raise PathNotCreateException(CFile.file_path(filename))
+
+        if ndjson and isinstance(self.__json_obj, list):
+            self.items_2_ndjson_file(self.__json_obj, filename)
+            return
+
+        # noinspection PyBroadException
+        try:
+            self.__write_file_atomic(filename, lambda f: self.__write_obj(f, self.__json_obj, 0))
         except Exception:
-            return demjson.encode(self.__json_obj)
+            # 存在无法直接序列化的对象时, 仍按原方式完整序列化后写入
+            str_info = self.to_json()
+            self.__write_file_atomic(filename, lambda f: f.write(str_info))
 
-    def to_file(self, filename):
+    @classmethod
+    def items_2_ndjson_file(cls, items, filename):
+        """
+        将多个json对象按NDJSON格式(每行一个json值)写入文件
+        1. items可以是列表或迭代器(如iter_file的返回值), 逐项序列化并写入
+        2. 先写入同目录下的临时文件, 完成后再替换目标文件
+        :param items:
+        :param filename:
+        :return:
+        """
         if not CFile.check_and_create_directory(filename):
             raise PathNotCreateException(CFile.file_path(filename))
-        str_info = self.to_json()
-        CFile.str_2_file(str_info, filename)
+
+        def write_items(f):
+            for item in items:
+                f.write(cls.__json_backend.dumps(item))
+                f.write('\n')
+
+        cls.__write_file_atomic(filename, write_items)
+
+    @classmethod
+    def __write_obj(cls, f, obj, depth: int):
+        """
+        将对象序列化后写入文件
+        1. 位于前几层或元素个数较多的字典和列表, 逐个元素递归写入
+        2. 其他对象一次性序列化后写入
+        :param f:
+        :param obj:
+        :param depth:
+        :return:
+        """
+        if isinstance(obj, dict) \
+                and (depth < cls.stream_container_depth or len(obj) >= cls.stream_container_min_size):
+            f.write('{')
+            for index, (key, value) in enumerate(obj.items()):
+                if index > 0:
+                    f.write(',')
+                f.write(cls.__json_backend.dumps(_normalize_json_key(key)))
+                f.write(':')
+                cls.__write_obj(f, value, depth + 1)
+            f.write('}')
+        elif isinstance(obj, (list, tuple)) \
+                and (depth < cls.stream_container_depth or len(obj) >= cls.stream_container_min_size):
+            f.write('[')
+            for index, item in enumerate(obj):
+                if index > 0:
+                    f.write(',')
+                cls.__write_obj(f, item, depth + 1)
+            f.write(']')
+        else:
+            f.write(cls.__json_backend.dumps(obj))
+
+    @classmethod
+    def __write_file_atomic(cls, filename, write_func):
+        """
+        先写入同目录下的临时文件, 完成后再替换目标文件
+        :param filename:
+        :param write_func: 写入函数, 参数为文件对象
+        :return:
+        """
+        temp_fd, temp_filename = cls.__create_temp_file(filename)
+        try:
+            with open(temp_fd, 'w', encoding=cls.Encoding_UTF8, buffering=cls.file_write_buffer_size) as f:
+                write_func(f)
+
+            # 覆盖已有文件时, 保留原文件的权限
+            if os.path.exists(filename):
+                shutil.copymode(filename, temp_filename)
+
+            os.replace(temp_filename, filename)
+        except BaseException:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+
+    @classmethod
+    def __create_temp_file(cls, filename):
+        """
+        在目标文件的同目录下新建临时文件
+        1. 按0o666新建, 由操作系统应用当前的umask, 权限与普通新建的文件一致
+        2. 不修改进程的umask, 避免其他线程同时新建的文件权限错误
+        :param filename:
+        :return: 临时文件的描述符和文件名
+        """
+        temp_path = os.path.dirname(os.path.abspath(filename))
+        temp_prefix = '.{0}.'.format(CFile.file_name(filename))
+        flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0)
+        while True:
+            temp_filename = os.path.join(temp_path, '{0}{1}.tmp'.format(temp_prefix, CUtils.one_id()))
+            try:
+                return os.open(temp_filename, flags, 0o666), temp_filename
+            except FileExistsError:
+                continue
 
     def set_value_of_name(self, name, value):
+        """
+        设置指定名称的值, 名称可以是点分路径, 如application.log.level
+        1. 在现有的字典和列表上逐级查找并直接修改, 不复制子节点
+        2. 中间节点不存在(或不是字典和列表)时, 自动创建为字典
+        3. 列表节点使用数字下标访问
+        :param name:
+        :param value:
+        :return:
+        """
         name_str = CUtils.any_2_str(name)
-        if name_str.find('.') == -1:
-            if isinstance(self.__json_obj, list):
-                self.__json_obj[int(name)] = value
-            else:
-                self.__json_obj[name] = value
+        name_key_list = name_str.split('.')
+        parent_obj = self.__json_obj
+        for name_key in name_key_list[:-1]:
+            child_obj = self.__value_of_key(parent_obj, name_key)
+            if not isinstance(child_obj, (dict, list)):
+                child_obj = dict()
+                self.__set_value_of_key(parent_obj, name_key, child_obj)
+            parent_obj = child_obj
+
+        self.__set_value_of_key(parent_obj, name_key_list[-1], value)
+
+    @classmethod
+    def __value_of_key(cls, obj, name_key: str):
+        """
+        获取字典或列表中一级名称的值, 不存在时返回None
+        :param obj:
+        :param name_key:
+        :return:
+        """
+        if isinstance(obj, list):
+            index = int(name_key)
+            if -len(obj) <= index < len(obj):
+                return obj[index]
+            return None
         else:
-            name_key_next_key = name_str.split('.', 1)
-            name_key = name_key_next_key[0]
-            name_next_key = name_key_next_key[1]
-
-            json_obj_new = CJson()
-            name_key_value = self.xpath_one(name_key, None)
-            if name_key_value is not None:
-                json_obj_new.load_obj(name_key_value)
-            json_obj_new.set_value_of_name(name_next_key, value)
-
-            if isinstance(self.__json_obj, list):
-                self.__json_obj[int(name_key)] = json_obj_new.json_obj
-            else:
-                self.__json_obj[name_key] = json_obj_new.json_obj
+            return obj.get(name_key)
+
+    @classmethod
+    def __set_value_of_key(cls, obj, name_key: str, value):
+        """
+        设置字典或列表中一级名称的值
+        :param obj:
+        :param name_key:
+        :param value:
+        :return:
+        """
+        if isinstance(obj, list):
+            obj[int(name_key)] = value
+        else:
+            obj[name_key] = value
 
     @property
     def json_obj(self):
@@ -189,12 +997,62 @@ class CJson:
         :param query:
         :return:
         """
-        result_list = jsonpath.jsonpath(self.__json_obj, query)
+        return self.__xpath_of_obj(self.__json_obj, query)
+
+    @classmethod
+    def simple_json_path_segments(cls, query: str):
+        """
+        将简单的点分路径(如application.log.level)拆分为各级名称组成的tuple, 其他查询语句返回None
+        :param query:
+        :return:
+        """
+        return _compiled_json_path(query)
+
+    @classmethod
+    def __xpath_of_obj(cls, json_obj, query) -> list:
+        """
+        在给定的对象中, 根据xpath查询语句获取节点列表
+        :param json_obj:
+        :param query:
+        :return:
+        """
+        # 简单的点分路径直接逐级查找, 结果与jsonpath一致
+        if isinstance(query, str):
+            segment_tuple = _compiled_json_path(query)
+            if segment_tuple is not None:
+                return cls.__simple_xpath(json_obj, segment_tuple)
+
+        result_list = jsonpath.jsonpath(json_obj, query)
         if not result_list:
             return []
         else:
             return result_list
 
+    @classmethod
+    def __simple_xpath(cls, obj, segment_tuple: tuple) -> list:
+        """
+        按简单点分路径的各级名称, 在字典和列表中逐级查找
+        :param obj:
+        :param segment_tuple:
+        :return:
+        """
+        if not obj:
+            return []
+
+        for segment in segment_tuple:
+            if isinstance(obj, dict):
+                if segment not in obj:
+                    return []
+                obj = obj[segment]
+            elif isinstance(obj, list) and segment.isdigit():
+                index = int(segment)
+                if index >= len(obj):
+                    return []
+                obj = obj[index]
+            else:
+                return []
+        return [obj]
+
     @classmethod
     def json_path(cls, json_text, json_path_str: str) -> list:
         """
@@ -209,13 +1067,71 @@ class CJson:
         elif str(json_text) == '':
             return []
         else:
-            json = CJson()
             try:
-                json.load_json_text(json_text)
-                return json.xpath(json_path_str)
+                return cls.normalize_obj(cls.__xpath_of_obj(cls.__parsed_json_obj(json_text), json_path_str))
             except Exception as err:
                 return []
 
+    @classmethod
+    def json_path_many(cls, json_text, json_path_str_list: list) -> list:
+        """
+        对同一个json文本, 一次解析后获取多个路径的值
+        1. 返回的列表与json_path_str_list一一对应, 每一项与json_path的返回结果一致
+        2. 如果json_text不是合法的json格式, 每一项均为空列表
+        :param json_text:
+        :param json_path_str_list:
+        :return:
+        """
+        if json_text is None or str(json_text) == '':
+            return [[] for json_path_str in json_path_str_list]
+
+        try:
+            json_obj = cls.__parsed_json_obj(json_text)
+        except Exception:
+            return [[] for json_path_str in json_path_str_list]
+
+        result_list = []
+        for json_path_str in json_path_str_list:
+            try:
+                result_list.append(cls.normalize_obj(cls.__xpath_of_obj(json_obj, json_path_str)))
+            except Exception:
+                result_list.append([])
+        return result_list
+
+    @classmethod
+    def __parsed_json_obj(cls, json_text):
+        """
+        获取json文本解析后的对象, 字符串使用解析缓存
+        1. 返回的对象可能是缓存中共享的对象, 不能修改; 从中获取的节点需要复制后再返回给调用者
+        :param json_text:
+        :return:
+        """
+        if isinstance(json_text, str):
+            json_obj = cls.json_parse_cache.get(json_text)
+            if json_obj is not None:
+                return json_obj
+
+        json = CJson()
+        json.load_json_text(json_text)
+        if isinstance(json_text, str):
+            cls.json_parse_cache.put(json_text, json.json_obj)
+        return json.json_obj
+
+    @classmethod
+    def __xpath_one_of_obj(cls, json_obj, query, attr_value_default) -> any:
+        """
+        在给定的对象中, 根据xpath查询语句获取第一个节点, 节点不存在时返回默认值
+        :param json_obj:
+        :param query:
+        :param attr_value_default:
+        :return:
+        """
+        result_list = cls.__xpath_of_obj(json_obj, query)
+        if len(result_list) == 0:
+            return attr_value_default
+        else:
+            return cls.normalize_obj(result_list[0])
+
     @classmethod
     def json_path_one(cls, json_text, json_path_str: str, attr_value_default) -> any:
         """
@@ -231,10 +1147,8 @@ class CJson:
         elif CUtils.any_2_str(json_text) == '':
             return attr_value_default
         else:
-            json = CJson()
             try:
-                json.load_json_text(json_text)
-                return json.xpath_one(json_path_str, attr_value_default)
+                return cls.__xpath_one_of_obj(cls.__parsed_json_obj(json_text), json_path_str, attr_value_default)
             except:
                 return attr_value_default
 
@@ -253,10 +1167,8 @@ class CJson:
         elif str(json_text) == '':
             return attr_value_default
         else:
-            json = CJson()
             try:
-                json.load_json_text(json_text)
-                return json.xpath_one(json_path_str, attr_value_default)
+                return cls.__xpath_one_of_obj(cls.__parsed_json_obj(json_text), json_path_str, attr_value_default)
             except Exception as err:
                 return attr_value_default
 
@@ -265,7 +1177,8 @@ class CJson:
         new_result = CJson()
         rt_json_text = CUtils.any_2_str(json_text)
         if not CUtils.equal_ignore_case(rt_json_text, ''):
-            new_result.load_json_text(rt_json_text)
+            # 解析缓存中的对象是共享的, 复制后再修改
+            new_result.__json_obj = cls.normalize_obj(cls.__parsed_json_obj(rt_json_text))
 
         new_result.set_value_of_name(attr_name, attr_value)
         return new_result.to_json()
@@ -285,12 +1198,24 @@ class CJson:
 
     @classmethod
     def str_2_file(cls, json_content, filename: str):
+        """
+        将json文本或对象写入文件
+        1. 文本直接写入, 不解析; 只有空文本和已知为非标准json的文本(见is_lenient_json), 才解析后重新序列化为标准json
+        2. 对象序列化后写入
+        :param json_content:
+        :param filename:
+        :return:
+        """
         if not CFile.check_and_create_directory(filename):
             raise PathNotCreateException(filename)
 
         json = CJson()
         if CUtils.is_str(json_content):
-            json.load_json_text(CUtils.any_2_str(json_content))
+            json_text = CUtils.any_2_str(json_content)
+            if json_text.strip() != '' and not cls.is_lenient_json(json_text):
+                cls.__write_file_atomic(filename, lambda f: f.write(json_text))
+                return
+            json.load_json_text(json_text)
         else:
             json.load_obj(json_content)
 
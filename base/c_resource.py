@@ -68,6 +68,10 @@ class CResource:
     FileType_File = 'file'
     FileType_Dir = 'dir'
 
+    Python_ObjType_Str = 'str'
+    Python_ObjType_Dict = 'dict'
+    Python_ObjType_List = 'list'
+
     Name_Application = 'application'
     Path_Setting_Application = Name_Application
     Path_Setting_Application_Dir = '{0}.{1}'.format(Path_Setting_Application, Name_Directory)
@@ -1,5 +1,8 @@
 import logging
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from base.c_file import CFile
 from base.c_json import CJson
@@ -8,10 +11,69 @@ from base.c_resource import CResource
 from base.c_utils import CUtils
 
 
+class CSettingsIndex:
+    """
+    冻结后的配置索引, 将配置树展开为"点分路径->值"的只读字典
+    1. 只收录简单的点分路径(与CJson.xpath的快速查找规则一致), 列表元素使用数字下标
+    2. 路径字符串均已驻留(sys.intern), 多个索引和多个进程之间共享相同的键
+    """
+    __slots__ = ('__value_dict',)
+
+    # 查找不到时的标记
+    Value_Not_Found = object()
+
+    def __init__(self, json_obj):
+        self.__value_dict = dict()
+        if json_obj:
+            self.__index_obj(json_obj, '')
+
+    def __index_obj(self, obj, path_prefix: str):
+        if isinstance(obj, dict):
+            item_list = obj.items()
+        elif isinstance(obj, list):
+            item_list = enumerate(obj)
+        else:
+            return
+
+        for key, value in item_list:
+            key = str(key)
+            # 名称中包含特殊字符的节点无法用简单点分路径表示, 不收录
+            if CJson.simple_json_path_segments(key) != (key,):
+                continue
+            path = sys.intern(key if path_prefix == '' else '{0}.{1}'.format(path_prefix, key))
+            self.__value_dict[path] = value
+            self.__index_obj(value, path)
+
+    def value(self, path: str):
+        """
+        获取路径对应的值, 路径不存在时返回Value_Not_Found
+        :param path:
+        :return:
+        """
+        return self.__value_dict.get(path, self.Value_Not_Found)
+
+    @property
+    def size(self) -> int:
+        return len(self.__value_dict)
+
+
 class CSettings(CJson):
+    # include配置合并结果的缓存文件目录, 位于当前用户的缓存目录下(不写入应用的配置目录), 各include文件未变化时直接读取;
+    # 设置为None时只使用进程内缓存
+    include_cache_path = os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+        'platform', 'settings_include'
+    )
+    # 缓存未命中时, 并行解析include配置的线程数
+    include_parse_max_workers = 8
+    # 进程内的include配置合并结果缓存, 以配置目录为key
+    __include_cache_lock = threading.Lock()
+    __include_cache_dict = dict()
+
     def __init__(self, obj):
         super().__init__()
         self.__system_debug = False
+        self.__settings_index = None
         self._app_root_dir = ''
         self.load_obj(obj)
         self.auto_parser_include()
@@ -21,6 +83,55 @@ class CSettings(CJson):
     def system_debug(self) -> bool:
         return self.__system_debug
 
+    def freeze(self):
+        """
+        冻结配置
+        1. 将配置树编译为只读的"点分路径->值"索引, xpath_one, switch_is_on, get_logger_level等查询为O(1)
+        2. 冻结后不能再修改配置; 查询返回的字典和列表与配置树共享, 也不能修改
+        :return:
+        """
+        if self.__settings_index is None:
+            self.__settings_index = CSettingsIndex(self.json_obj)
+
+    def is_frozen(self) -> bool:
+        return self.__settings_index is not None
+
+    def __check_not_frozen(self):
+        if self.__settings_index is not None:
+            raise Exception('配置已冻结, 无法修改! ')
+
+    def load_json_text(self, json_content: str):
+        self.__check_not_frozen()
+        super().load_json_text(json_content)
+
+    def load_obj(self, obj):
+        self.__check_not_frozen()
+        super().load_obj(obj)
+
+    def set_value_of_name(self, name, value):
+        self.__check_not_frozen()
+        super().set_value_of_name(name, value)
+
+    def xpath(self, query) -> list:
+        """
+        冻结后, 简单的点分路径直接从索引中查找, 其他查询语句仍使用jsonpath
+        :param query:
+        :return:
+        """
+        if self.__settings_index is not None and isinstance(query, str):
+            path = query[2:] if query.startswith('$.') else query
+            value = self.__settings_index.value(path)
+            if value is not CSettingsIndex.Value_Not_Found:
+                return [value]
+
+            segment_tuple = self.simple_json_path_segments(query)
+            # 索引中收录了所有简单点分路径, 查找不到即为不存在; 数字下标不规范(如01)时仍按jsonpath查找
+            if segment_tuple is not None \
+                    and all((not segment.isdigit()) or segment == str(int(segment)) for segment in segment_tuple):
+                return []
+
+        return super().xpath(query)
+
     def auto_parser_include(self):
         root_path = COS.environ().get('TSDB_HOME')
         if CUtils.equal_ignore_case(root_path, None):
@@ -38,19 +149,8 @@ class CSettings(CJson):
         self.set_app_information(self._app_root_dir, app_name)
 
     def set_app_information(self, app_dir, app_name):
-        json_app = self.xpath_one(CResource.Path_Setting_Application, None)
-        if json_app is None:
-            self.set_value_of_name(
-                CResource.Name_Application,
-                {
-                    CResource.Name_Name: app_name,
-                    CResource.Name_Directory: app_dir
-                }
-            )
-        else:
-            json_app[CResource.Name_Name] = app_name
-            json_app[CResource.Name_Directory] = app_dir
-            self.set_value_of_name(CResource.Name_Application, json_app)
+        self.set_value_of_name(CJson.json_join(CResource.Name_Application, CResource.Name_Name), app_name)
+        self.set_value_of_name(CJson.json_join(CResource.Name_Application, CResource.Name_Directory), app_dir)
 
         self.init_sys_path()
 
@@ -84,31 +184,140 @@ class CSettings(CJson):
         )
 
     def parser_include(self, include_file_path):
+        """
+        解析并合并include配置
+        1. 以include列表及各文件的路径, 修改时间和大小为key, 命中进程内缓存或缓存文件时, 直接使用合并结果
+        2. 未命中时并行解析各include配置, 按列表顺序合并后, 写入缓存
+        :param include_file_path:
+        :return:
+        """
         include_node_list = self.xpath_one(CResource.Name_Include, None)
         if include_node_list is None:
             return
 
-        new_settings_dict = dict()
+        include_cache_key = []
         for include_node in include_node_list:
-            if not CUtils.equal_ignore_case(CFile.file_ext(include_node), CResource.FileExt_Json):
-                include_node = '{0}.{1}'.format(include_node, CResource.FileExt_Json)
-
-            include_json_filename = CFile.join_file(include_file_path, CResource.Name_Project, include_node)
-            if not CFile.file_or_path_exist(include_json_filename):
-                include_json_filename = CFile.join_file(include_file_path, CResource.Name_Settings,
-                                                        CResource.Name_Template, include_node)
-            if not CFile.file_or_path_exist(include_json_filename):
-                include_json_filename = CFile.join_file(include_file_path, CResource.Name_Settings,
-                                                        CResource.Name_Debug, include_node)
+            include_json_filename, include_json_file_stat = self.__include_file_stat(include_file_path, include_node)
+            include_cache_key.append(
+                [include_json_filename, include_json_file_stat.st_mtime_ns, include_json_file_stat.st_size]
+            )
 
-            if not CFile.file_or_path_exist(include_json_filename):
-                raise Exception('配置文件[{0}]未找到, 无法初始化! '.format(include_json_filename))
+        new_settings_dict = self.__include_settings_of_cache(include_file_path, include_cache_key)
+        if new_settings_dict is None:
+            include_json_filename_list = [include_file_info[0] for include_file_info in include_cache_key]
+            with ThreadPoolExecutor(
+                    max_workers=max(1, min(self.include_parse_max_workers, len(include_json_filename_list)))
+            ) as executor:
+                include_settings_dict_list = list(
+                    executor.map(lambda filename: CJson.from_file(filename).json_obj, include_json_filename_list)
+                )
 
-            include_settings_dict = CJson.from_file(include_json_filename).json_obj
-            new_settings_dict = CUtils.dict_append_dict(new_settings_dict, include_settings_dict)
+            new_settings_dict = dict()
+            for include_settings_dict in include_settings_dict_list:
+                new_settings_dict = CUtils.dict_append_dict(new_settings_dict, include_settings_dict)
+            self.__include_settings_to_cache(include_file_path, include_cache_key, new_settings_dict)
 
         self.load_obj(new_settings_dict)
 
+    @classmethod
+    def __include_file_stat(cls, include_file_path, include_node):
+        """
+        依次在project, settings/template, settings/debug目录下查找include配置文件
+        :param include_file_path:
+        :param include_node:
+        :return: 配置文件名和文件的stat信息
+        """
+        if not CUtils.equal_ignore_case(CFile.file_ext(include_node), CResource.FileExt_Json):
+            include_node = '{0}.{1}'.format(include_node, CResource.FileExt_Json)
+
+        include_json_filename_list = [
+            CFile.join_file(include_file_path, CResource.Name_Project, include_node),
+            CFile.join_file(include_file_path, CResource.Name_Settings, CResource.Name_Template, include_node),
+            CFile.join_file(include_file_path, CResource.Name_Settings, CResource.Name_Debug, include_node)
+        ]
+        for include_json_filename in include_json_filename_list:
+            try:
+                return include_json_filename, os.stat(include_json_filename)
+            except OSError:
+                continue
+
+        raise Exception('配置文件[{0}]未找到, 无法初始化! '.format(include_json_filename_list[-1]))
+
+    @classmethod
+    def __include_settings_of_cache(cls, include_file_path, include_cache_key: list):
+        """
+        从进程内缓存或缓存文件中获取include配置的合并结果, 未命中时返回None
+        :param include_file_path:
+        :param include_cache_key:
+        :return:
+        """
+        with cls.__include_cache_lock:
+            cache_item = cls.__include_cache_dict.get(include_file_path)
+        if cache_item is not None and cache_item[0] == include_cache_key:
+            return cache_item[1]
+
+        cache_file_name = cls.__include_cache_file_name(include_file_path)
+        if cache_file_name is None or not CFile.file_or_path_exist(cache_file_name):
+            return None
+
+        # noinspection PyBroadException
+        try:
+            cache_json = CJson()
+            cache_json.load_json_text(CFile.file_2_str(cache_file_name, CJson.Encoding_UTF8))
+        except Exception:
+            return None
+
+        if cache_json.xpath_one(CResource.Name_Include, None) != include_cache_key:
+            return None
+        new_settings_dict = cache_json.xpath_one(CResource.Name_Settings, None)
+        if not isinstance(new_settings_dict, dict):
+            return None
+
+        with cls.__include_cache_lock:
+            cls.__include_cache_dict[include_file_path] = (include_cache_key, new_settings_dict)
+        return new_settings_dict
+
+    @classmethod
+    def __include_settings_to_cache(cls, include_file_path, include_cache_key: list, new_settings_dict: dict):
+        """
+        将include配置的合并结果写入进程内缓存和缓存文件, 缓存目录不可写时只使用进程内缓存
+        :param include_file_path:
+        :param include_cache_key:
+        :param new_settings_dict:
+        :return:
+        """
+        with cls.__include_cache_lock:
+            cls.__include_cache_dict[include_file_path] = (include_cache_key, new_settings_dict)
+
+        cache_file_name = cls.__include_cache_file_name(include_file_path)
+        if cache_file_name is None:
+            return
+
+        # 缓存文件写入失败(如只读部署)不影响配置的加载
+        # noinspection PyBroadException
+        try:
+            if CFile.check_and_create_directory_itself(cls.include_cache_path):
+                CJson.str_2_file(
+                    {CResource.Name_Include: include_cache_key, CResource.Name_Settings: new_settings_dict},
+                    cache_file_name
+                )
+        except Exception:
+            pass
+
+    @classmethod
+    def __include_cache_file_name(cls, include_file_path):
+        """
+        配置目录对应的缓存文件名, 以配置目录绝对路径的md5命名; 未设置缓存目录时返回None
+        :param include_file_path:
+        :return:
+        """
+        if cls.include_cache_path is None:
+            return None
+        return CFile.join_file(
+            cls.include_cache_path,
+            '{0}.{1}'.format(CUtils.to_md5(os.path.abspath(include_file_path)), CResource.FileExt_Json)
+        )
+
     def init_environ(self):
         """
         初始化系统运行环境
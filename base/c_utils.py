@@ -1,18 +1,277 @@
 from __future__ import absolute_import
 
+import bisect
 import hashlib
 import math
 import re
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from string import Template
 from urllib import parse
 
 from base.c_resource import CResource
 from base.c_time import CTime
 
+# 日期格式中各占位符对应的正则表达式, 与datetime.strptime的规则一致
+_datetime_directive_regex_dict = {
+    'Y': r'(?P<Y>\d\d\d\d)',
+    'm': r'(?P<m>1[0-2]|0[1-9]|[1-9])',
+    'd': r'(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'H': r'(?P<H>2[0-3]|[0-1]\d|\d)',
+    'M': r'(?P<M>[0-5]\d|\d)',
+    'S': r'(?P<S>6[0-1]|[0-5]\d|\d)',
+    'f': r'(?P<f>[0-9]{1,6})'
+}
+# 将数字统一替换为0, 得到日期文本的形状, 形状相同的文本使用相同的日期格式
+_datetime_shape_table = str.maketrans('123456789', '000000000')
+# 按形状无法解析, 返回默认值
+_Datetime_Plan_Default = 'default'
+# 按形状不属于任何一种日期格式, 返回None
+_Datetime_Plan_None = 'none'
+
+
+@lru_cache(maxsize=256)
+def _datetime_format_regex(datetime_format: str):
+    """
+    将strptime的日期格式编译为正则表达式
+    """
+    regex_list = []
+    index = 0
+    while index < len(datetime_format):
+        char = datetime_format[index]
+        if char == '%' and index + 1 < len(datetime_format):
+            regex_list.append(_datetime_directive_regex_dict[datetime_format[index + 1]])
+            index = index + 2
+            continue
+        regex_list.append(r'\s+' if char.isspace() else re.escape(char))
+        index = index + 1
+    return re.compile(''.join(regex_list), re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _standard_datetime_plan(date_shape: str):
+    """
+    根据日期文本的形状, 确定standard_datetime_format使用的解析格式和输出格式
+    :return: (解析格式, 输出格式), 或_Datetime_Plan_Default, _Datetime_Plan_None
+    """
+    str_len = len(date_shape)
+
+    # 汉字标记
+    ch_flag = ('年' in date_shape) or ('月' in date_shape) or ('日' in date_shape)
+    # 日期时间标记
+    sign_flag = ('T' in date_shape) or ('CST' in date_shape) or (' ' in date_shape)
+
+    sign_real = " "
+    for sign in ['CST', 'T']:
+        if sign in date_shape:
+            sign_real = sign
+            break
+
+    if ch_flag:
+        if str_len == 5:
+            return '%Y年', '%Y'
+        elif (str_len == 7) or (str_len == 8):
+            return '%Y年%m月', '%Y-%m'
+        elif str_len >= 9:
+            if sign_flag:
+                sec_real = ".%f" if "." in date_shape else ""
+                return '%Y年%m月%d日{0}%H:%M:%S{1}'.format(sign_real, sec_real), '%Y-%m-%d %H:%M:%S'
+            return '%Y年%m月%d日', '%Y-%m-%d'
+    else:
+        if str_len == 4:
+            return '%Y', '%Y'
+        elif (str_len == 6) or (str_len == 7):
+            return '%Y{0}%m'.format(_datetime_separator(date_shape)), '%Y-%m'
+        elif str_len >= 8:
+            if sign_flag:
+                date_time_list = date_shape.split(sign_real)
+                if len(date_time_list) != 2:
+                    return _Datetime_Plan_Default
+                date, time = date_time_list
+                sep_real = _datetime_separator(date)
+                sec_real = ".%f" if "." in time else ""
+                return '%Y{0}%m{0}%d{1}%H:%M:%S{2}'.format(sep_real, sign_real, sec_real), '%Y-%m-%d %H:%M:%S'
+            sep_real = _datetime_separator(date_shape)
+            return '%Y{0}%m{0}%d'.format(sep_real), '%Y-%m-%d'
+    return _Datetime_Plan_None
+
+
+def _datetime_separator(date_shape: str) -> str:
+    for sep in ['-', '/', '.']:
+        if sep in date_shape:
+            return sep
+    return ""
+
+
+# text_is_date_day等方法对应的日期格式类别
+_Text_Datetime_Kind_Day = 'day'
+_Text_Datetime_Kind_Month = 'month'
+_Text_Datetime_Kind_Year = 'year'
+_Text_Datetime_Kind_DateTime = 'datetime'
+_Text_Datetime_Kind_DayAndTime = 'day_and_time'
+
+
+@lru_cache(maxsize=4096)
+def _text_datetime_format(datetime_kind: str, text_shape: str):
+    """
+    根据文本的形状, 确定text_is_date_day等方法使用的strptime格式
+    :return: 日期格式, 按形状不可能是日期时返回None
+    """
+    sep_real = ""
+    for sep in ['-', '/']:
+        if sep in text_shape:
+            sep_real = sep
+            break
+
+    if datetime_kind == _Text_Datetime_Kind_Day:
+        # 日期格式最低8位
+        if len(text_shape) < 8:
+            return None
+        return "%Y{0}%m{0}%d".format(sep_real)
+    elif datetime_kind == _Text_Datetime_Kind_Month:
+        return "%Y{0}%m".format(sep_real)
+    elif datetime_kind == _Text_Datetime_Kind_Year:
+        return "%Y"
+
+    # 判断是否带T，GMT
+    check_shape = text_shape.replace(' ', '')
+    sign_real = ""
+    for sign in ['T', 'CST']:
+        if sign in check_shape:
+            sign_real = sign
+            break
+    colon_real = ":" if ":" in check_shape else ""
+
+    if datetime_kind == _Text_Datetime_Kind_DateTime:
+        second_real = ".%f" if "." in check_shape else ""
+        z_real = "Z" if "Z" in check_shape else ""
+        return "%Y{0}%m{0}%d{1}%H{2}%M{2}%S{3}{4}".format(sep_real, sign_real, colon_real, second_real, z_real)
+    else:
+        return "%Y{0}%m{0}%d{1}%H{2}%M{2}%S".format(sep_real, sign_real, colon_real)
+
+
+# 汉字按GB2312编码区段对应的拼音首字母, 区段首尾相连, 按区段起始编码(首两个字节的编码值-65536)排序
+_pinyin_initial_start_list = [
+    -20319, -20283, -19775, -19218, -18710, -18526, -18239, -17922, -17417, -16474, -16212,
+    -15640, -15165, -14922, -14914, -14630, -14149, -14090, -13118, -12838, -12556, -11847, -11055
+]
+_pinyin_initial_letter_list = [
+    'a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'j', 'k', 'l',
+    'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'w', 'x', 'y', 'z'
+]
+_Pinyin_Initial_End = -10247
+
+
+@lru_cache(maxsize=None)
+def _pinyin_initial_of_char(char: str) -> str:
+    """
+    获取单个字符的拼音首字母, 非汉字原样返回
+    """
+    char_bytes = char.encode(CResource.Encoding_Chinese)
+    if len(char_bytes) == 1:
+        return char
+    code = char_bytes[0] * 256 + char_bytes[1] - 65536
+    if code > _Pinyin_Initial_End:
+        return char
+    index = bisect.bisect_right(_pinyin_initial_start_list, code) - 1
+    if index < 0:
+        return char
+    return _pinyin_initial_letter_list[index]
+
+
+@lru_cache(maxsize=4096)
+def _pinyin_initial_text(text: str):
+    """
+    获取文本的拼音首字母, 文本为空时返回None
+    """
+    if text.strip().lower() == '':
+        return None
+    return ''.join(map(_pinyin_initial_of_char, text.lower().strip().replace(' ', '')))
+
+
+class CDictKeyIndex:
+    """
+    字典键名的忽略大小写索引: 规范化的键名(去除首尾空格并转为小写) -> 原始键名
+    1. 多个原始键名的规范化结果相同时, 保留字典中第一个出现的键名, 与逐个比较的结果一致
+    2. 不引用字典本身, 缓存中的索引不会使调用方的字典(及其值)无法释放, 只保留键名
+    3. 查找时校验索引是否仍然对应字典, 失效时返回Key_Index_Invalid, 由调用方重建索引:
+        1. 找到唯一的键名时, 只检查字典的长度和该键名是否仍然存在, 为O(1)
+        2. 未找到, 或名称对应多个原始键名时, 与建立索引时的键名快照(有序元组)比较, 确认字典的键名没有变化
+    """
+    __slots__ = ('__key_snapshot', '__key_dict', '__duplicate_name_set')
+
+    # 索引已失效的标记
+    Key_Index_Invalid = object()
+
+    def __init__(self, dict_obj: dict):
+        self.__key_snapshot = tuple(dict_obj)
+        self.__key_dict = dict()
+        self.__duplicate_name_set = set()
+        for key in self.__key_snapshot:
+            normalized_name = CUtils.normalize_name(key)
+            if normalized_name in self.__key_dict:
+                self.__duplicate_name_set.add(normalized_name)
+            else:
+                self.__key_dict[normalized_name] = key
+
+    def key_of_name(self, dict_obj: dict, normalized_name: str, default_key):
+        """
+        根据规范化的名称获取原始键名, 不存在时返回default_key, 索引已失效时返回Key_Index_Invalid
+        :param dict_obj:
+        :param normalized_name:
+        :param default_key:
+        :return:
+        """
+        if len(dict_obj) != len(self.__key_snapshot):
+            return self.Key_Index_Invalid
+
+        key = self.__key_dict.get(normalized_name, default_key)
+        if key is not default_key and normalized_name not in self.__duplicate_name_set:
+            return key if key in dict_obj else self.Key_Index_Invalid
+
+        # 键名的增删可能保持字典长度不变, 未找到时需要确认字典的键名没有变化
+        return key if tuple(dict_obj) == self.__key_snapshot else self.Key_Index_Invalid
+
+
+class CNameIndex:
+    """
+    名称列表的忽略大小写索引: 规范化的名称(去除首尾空格并转为小写) -> 第一次出现的位置及出现次数
+    1. 对同一个列表多次查找时, 先建立索引, 每次查找为O(1)
+    2. 查找结果与CUtils.list_exists, list_index_of, list_count忽略大小写时一致
+    """
+    __slots__ = ('__index_dict', '__count_dict')
+
+    def __init__(self, name_list: list):
+        self.__index_dict = dict()
+        self.__count_dict = dict()
+        for index, name in enumerate(name_list):
+            normalized_name = CUtils.normalize_name(name)
+            self.__index_dict.setdefault(normalized_name, index)
+            self.__count_dict[normalized_name] = self.__count_dict.get(normalized_name, 0) + 1
+
+    def exists(self, name) -> bool:
+        return CUtils.normalize_name(name) in self.__index_dict
+
+    def index_of(self, name) -> int:
+        return self.__index_dict.get(CUtils.normalize_name(name), -1)
+
+    def count(self, name) -> int:
+        return self.__count_dict.get(CUtils.normalize_name(name), 0)
+
 
 class CUtils(CResource):
+    # 键名个数达到此值的字典, 忽略大小写查找时建立并缓存键名索引, 更小的字典直接逐个比较
+    dict_key_index_min_size = 16
+    # 缓存的字典键名索引个数
+    dict_key_index_cache_size = 256
+    __dict_key_index_lock = threading.Lock()
+    __dict_key_index_cache = OrderedDict()
+    # 查找不到键名时的标记
+    __dict_key_not_found = object()
+
     @classmethod
     def str_append(cls, src_str: str, second_str: str, seperator_str: str = '\n') -> str:
         result = cls.any_2_str(src_str)
@@ -86,11 +345,11 @@ class CUtils(CResource):
         # 保证不会地址传递
         result = text[:]
 
-        dict_keys = cls.dict_keys(dict_obj)
+        dict_key_index = cls.list_name_index(cls.dict_keys(dict_obj))
         params_list = cls.findall_of_regular(r'\$\{(.*?)\}', CUtils.any_2_str(text))
 
         for param_name in params_list:
-            if CUtils.list_exists(dict_keys, param_name):
+            if dict_key_index.exists(param_name):
                 result = CUtils.replace(
                     result, '${%s}' % CUtils.any_2_str(param_name), cls.dict_value_by_name(dict_obj, param_name, '')
                 )
@@ -182,17 +441,77 @@ class CUtils(CResource):
         if dict_obj is None:
             return default_value
 
+        if ignore_case:
+            key = cls.__dict_key_of_name(dict_obj, name)
+            if key is cls.__dict_key_not_found:
+                return default_value
+            return dict_obj[key]
+
+        rt_name = name.strip()
         keys = dict_obj.keys()
         for key in keys:
-            if ignore_case:
-                if cls.equal_ignore_case(key, name):
-                    return dict_obj[key]
-            else:
-                if key.strip() == name.strip():
-                    return dict_obj[key]
+            if key.strip() == rt_name:
+                return dict_obj[key]
         else:
             return default_value
 
+    @classmethod
+    def normalize_name(cls, name) -> str:
+        """
+        名称的规范化形式(去除首尾空格并转为小写), 两个名称的规范化形式相同时, equal_ignore_case为True
+        :param name:
+        :return:
+        """
+        if isinstance(name, str):
+            return name.strip().lower()
+        return cls.any_2_str(name).strip().lower()
+
+    @classmethod
+    def __dict_key_of_name(cls, dict_obj: dict, name):
+        """
+        忽略大小写, 获取字典中与名称相同的第一个原始键名
+        1. 较大的字典使用缓存的键名索引, 重复查找时为O(1)
+        2. 不存在时返回__dict_key_not_found
+        :param dict_obj:
+        :param name:
+        :return:
+        """
+        normalized_name = cls.normalize_name(name)
+        if not isinstance(dict_obj, dict) or len(dict_obj) < cls.dict_key_index_min_size:
+            for key in dict_obj.keys():
+                if cls.normalize_name(key) == normalized_name:
+                    return key
+            return cls.__dict_key_not_found
+
+        key = cls.__dict_key_index(dict_obj, False).key_of_name(dict_obj, normalized_name, cls.__dict_key_not_found)
+        if key is CDictKeyIndex.Key_Index_Invalid:
+            key = cls.__dict_key_index(dict_obj, True).key_of_name(dict_obj, normalized_name, cls.__dict_key_not_found)
+        return key
+
+    @classmethod
+    def __dict_key_index(cls, dict_obj: dict, rebuild: bool) -> CDictKeyIndex:
+        """
+        获取字典的键名索引, 缓存中不存在或需要重建(已失效)时重新建立
+        :param dict_obj:
+        :param rebuild: 是否重新建立索引
+        :return:
+        """
+        cache_key = id(dict_obj)
+        if not rebuild:
+            with cls.__dict_key_index_lock:
+                key_index = cls.__dict_key_index_cache.get(cache_key)
+                if key_index is not None:
+                    cls.__dict_key_index_cache.move_to_end(cache_key)
+                    return key_index
+
+        key_index = CDictKeyIndex(dict_obj)
+        with cls.__dict_key_index_lock:
+            cls.__dict_key_index_cache[cache_key] = key_index
+            cls.__dict_key_index_cache.move_to_end(cache_key)
+            while len(cls.__dict_key_index_cache) > cls.dict_key_index_cache_size:
+                cls.__dict_key_index_cache.popitem(last=False)
+        return key_index
+
     @classmethod
     def dict_set_value(cls, dict_obj: dict, name: str, value) -> dict:
         result = dict(dict_obj)
@@ -243,9 +562,10 @@ class CUtils(CResource):
         elif not ignore_case:
             return list_obj.count(name)
         else:
+            normalized_name = cls.normalize_name(name)
             result_int = 0
             for list_item in list_obj:
-                if cls.equal_ignore_case(cls.any_2_str(list_item), name):
+                if cls.normalize_name(list_item) == normalized_name:
                     result_int = result_int + 1
             return result_int
 
@@ -256,9 +576,10 @@ class CUtils(CResource):
         elif not ignore_case:
             return list_obj.index(name)
         else:
+            normalized_name = cls.normalize_name(name)
             for result_int in range(len(list_obj)):
                 list_item = list_obj[result_int]
-                if cls.equal_ignore_case(cls.any_2_str(list_item), name):
+                if cls.normalize_name(list_item) == normalized_name:
                     return result_int
             return -1
 
@@ -273,11 +594,44 @@ class CUtils(CResource):
             except:
                 return False
         else:
+            normalized_name = cls.normalize_name(name)
             for list_item in list_obj:
-                if cls.equal_ignore_case(cls.any_2_str(list_item), name):
+                if cls.normalize_name(list_item) == normalized_name:
                     return True
             return False
 
+    @classmethod
+    def list_name_index(cls, list_obj: list) -> CNameIndex:
+        """
+        建立列表的忽略大小写索引, 用于在同一个列表中多次查找
+        :param list_obj:
+        :return:
+        """
+        if list_obj is None:
+            return CNameIndex([])
+        return CNameIndex(list_obj)
+
+    @classmethod
+    def list_exists_many(cls, list_obj: list, name_list: list, ignore_case=True) -> list:
+        """
+        批量检查多个名称是否在列表中, 列表只遍历一次
+        :param list_obj:
+        :param name_list:
+        :param ignore_case:
+        :return: 与name_list一一对应的检查结果列表, 每一项与list_exists的结果一致
+        """
+        if list_obj is None:
+            return [False for name in name_list]
+        elif not ignore_case:
+            try:
+                item_set = set(list_obj)
+            except TypeError:
+                return [name in list_obj for name in name_list]
+            return [name in item_set for name in name_list]
+        else:
+            name_index = CNameIndex(list_obj)
+            return [name_index.exists(name) for name in name_list]
+
     @classmethod
     def list_2_str(cls, list_obj: list, prefix: str, separator: str, suffix: str, ignore_empty: bool = False) -> str:
         if list_obj is None:
@@ -437,22 +791,7 @@ class CUtils(CResource):
         @param check_text:
         @return:
         """
-        # 日期格式最低8位
-        if CUtils.len_of_text(check_text) < 8:
-            return False
-        time_format = "%Y{0}%m{0}%d"
-        sep_real = ""
-        sep_list = ['-', '/']
-        for sep in sep_list:
-            if sep in check_text:
-                sep_real = sep
-                break
-        time_format_real = time_format.format(sep_real)
-        default_date = CTime.now()
-        date_value = CTime.from_datetime_str(check_text, default_date, time_format_real)
-        if CUtils.equal_ignore_case(date_value, default_date):
-            return False
-        return True
+        return cls.__text_is_datetime_of_kind(check_text, _Text_Datetime_Kind_Day)
 
     @classmethod
     def text_is_date_month(cls, check_text: str) -> bool:
@@ -461,32 +800,18 @@ class CUtils(CResource):
         @param check_text:
         @return:
         """
-        time_format = "%Y{0}%m"
-        sep_real = ""
-        sep_list = ['-', '/']
-        for sep in sep_list:
-            if sep in check_text:
-                sep_real = sep
-                break
-        time_format_real = time_format.format(sep_real)
-        default_date = CTime.now()
-        date_value = CTime.from_datetime_str(check_text, default_date, time_format_real)
-        if CUtils.equal_ignore_case(date_value, default_date):
-            return False
-        return True
+        return cls.__text_is_datetime_of_kind(check_text, _Text_Datetime_Kind_Month)
 
     @classmethod
     def text_is_date_month_nosep(cls, check_text: str) -> bool:
         """
         判断时间类型(只有月份，并且没有‘-’or‘/’，例如YYYYMM)
         """
-        sep_list = ['-', '/']
-        for sep in sep_list:
-            if sep in check_text:
-                return False
-        if CUtils.text_is_date_month(check_text):
-            return True
-        return False
+        if not isinstance(check_text, str):
+            return False
+        if ('-' in check_text) or ('/' in check_text):
+            return False
+        return cls.text_is_date_month(check_text)
 
     @classmethod
     def text_is_date_year(cls, check_text: str) -> bool:
@@ -495,12 +820,7 @@ class CUtils(CResource):
         @param check_text:
         @return:
         """
-        time_format = "%Y"
-        default_date = CTime.now()
-        date_value = CTime.from_datetime_str(check_text, default_date, time_format)
-        if CUtils.equal_ignore_case(date_value, default_date):
-            return False
-        return True
+        return cls.__text_is_datetime_of_kind(check_text, _Text_Datetime_Kind_Year)
 
     @classmethod
     def text_is_datetime(cls, check_text: str) -> bool:
@@ -510,38 +830,26 @@ class CUtils(CResource):
         @param check_text:
         @return:
         """
-        time_format = "%Y{0}%m{0}%d{1}%H{2}%M{2}%S{3}{4}"
-        sep_real = ""
-        sep_list = ['-', '/']
-        for sep in sep_list:
-            if sep in check_text:
-                sep_real = sep
-                break
-        # 判断是否带T，GMT
-        sign_real = ""
-        check_text = check_text.replace(' ', '')
-        sign_list = ['T', 'CST']
-        for sign in sign_list:
-            if sign in check_text:
-                sign_real = sign
-                break
-
-        colon_real = ""
-        if ":" in check_text:
-            colon_real = ":"
-        second_real = ""
-        if "." in check_text:
-            second_real = ".%f"
-        z_real = ""
-        if "Z" in check_text:
-            z_real = "Z"
-
-        time_format_real = time_format.format(sep_real, sign_real, colon_real, second_real, z_real)
-        default_date = CTime.now()
-        date_value = CTime.from_datetime_str(check_text, default_date, time_format_real)
-        if CUtils.equal_ignore_case(date_value, default_date):
+        return cls.__text_is_datetime_of_kind(check_text, _Text_Datetime_Kind_DateTime)
+
+    @classmethod
+    def __text_is_datetime_of_kind(cls, check_text: str, datetime_kind: str) -> bool:
+        """
+        按文本的形状(数字统一替换后的文本)获取缓存的日期格式, 再按格式解析, 不使用异常判断是否解析成功
+        @param check_text:
+        @param datetime_kind:
+        @return:
+        """
+        if not isinstance(check_text, str):
+            return False
+
+        datetime_format = _text_datetime_format(datetime_kind, check_text.translate(_datetime_shape_table))
+        if datetime_format is None:
             return False
-        return True
+
+        if datetime_kind == _Text_Datetime_Kind_DateTime:
+            check_text = check_text.replace(' ', '')
+        return cls.datetime_of_format(check_text, datetime_format) is not None
 
     @classmethod
     def text_is_date_or_datetime(cls, check_text: str) -> bool:
@@ -594,124 +902,81 @@ class CUtils(CResource):
         """
         将日期或日期时间格式化为YYYY-MM-DD HH:MM:SS格式，如20201022,2020/10/22格式化为2020-10-22，
             20201022 22:22:22.345,2020/10/22 22:22:22.345格式化为2020-10-22 22:22:22.345, 2020-10-22T22:22:22.000007
+        日期格式按文本的形状(数字统一替换后的文本)识别并缓存, 形状相同的文本不再重复识别
         @param date_text:
         @param default_date:  CTime.now()
         @return:
         """
-        # default_date = CTime.now()
+        # noinspection PyBroadException
         try:
-            time_format_real = '%Y-%m-%d %H:%M:%S'
-            time_format = ["%Y{0}", "%Y{0}%m{1}", "%Y{0}%m{1}%d{2}{3}%H:%M:%S{4}", "%Y{0}%m{1}%d{2}", "%Y",
-                           "%Y{0}%m", "%Y{0}%m{0}%d{1}%H:%M:%S{2}", "%Y{0}%m{0}%d"]
+            date_text = cls.any_2_str(date_text)
+            datetime_plan = _standard_datetime_plan(date_text.translate(_datetime_shape_table))
+            if datetime_plan == _Datetime_Plan_None:
+                return None
+            elif datetime_plan == _Datetime_Plan_Default:
+                return default_date
+
+            date_value = cls.datetime_of_format(date_text, datetime_plan[0])
+            if date_value is None:
+                return default_date
+            return CTime.format_str(date_value, datetime_plan[1])
+        except:
+            return default_date
 
+    @classmethod
+    def standard_datetime_format_batch(cls, date_text_list, return_datetime: bool = False):
+        """
+        批量将日期或日期时间格式化, 每一项的结果与standard_datetime_format一致
+        1. 按文本的形状识别日期格式并缓存, 大量同类文本只识别一次
+        2. 使用预编译的正则表达式解析, 不使用异常判断是否解析成功
+        @param date_text_list: 日期文本的列表或数组
+        @param return_datetime: 是否返回datetime对象, 否则返回格式化后的文本
+        @return: 结果列表和有效标记列表, 无法解析的项结果为None, 有效标记为False
+        """
+        result_list = []
+        valid_list = []
+        for date_text in date_text_list:
             date_text = cls.any_2_str(date_text)
-            str_len = len(date_text)
-
-            # 汉字标记
-            ch_flag = 0
-            if ('年' in date_text) or ('月' in date_text) or ('日' in date_text):
-                ch_flag = 1
-
-            # 日期时间标记
-            sign_flag = 0
-            sign_list = ['T', 'CST', ' ']
-            for sign in sign_list:
-                if sign in date_text:
-                    sign_flag = 1
-                    break
-
-            if ch_flag:
-                if str_len == 5:
-                    time_format_real = time_format[0].format('年')
-                    date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                    if CUtils.equal_ignore_case(date_value, default_date):
-                        return default_date
-                    return CTime.format_str(date_value, '%Y')
-                elif (str_len == 7) or (str_len == 8):
-                    time_format_real = time_format[1].format('年', '月')
-                    date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                    if CUtils.equal_ignore_case(date_value, default_date):
-                        return default_date
-                    return CTime.format_str(date_value, '%Y-%m')
-                elif str_len >= 9:
-                    if sign_flag:
-                        sign_real = " "
-                        sign_list = ['CST', 'T']
-                        for sign in sign_list:
-                            if sign in date_text:
-                                sign_real = sign
-                                break
-                        sec_real = ""
-                        if "." in date_text:
-                            sec_real = ".%f"
-                        time_format_real = time_format[2].format('年', '月', '日', sign_real, sec_real)
-                        date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                        if CUtils.equal_ignore_case(date_value, default_date):
-                            return default_date
-                        return CTime.format_str(date_value, '%Y-%m-%d %H:%M:%S')
-                    else:
-                        time_format_real = time_format[3].format('年', '月', '日')
-                    date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                    if CUtils.equal_ignore_case(date_value, default_date):
-                        return default_date
-                    return CTime.format_str(date_value, '%Y-%m-%d')
+            datetime_plan = _standard_datetime_plan(date_text.translate(_datetime_shape_table))
+            date_value = None
+            if isinstance(datetime_plan, tuple):
+                date_value = cls.datetime_of_format(date_text, datetime_plan[0])
+
+            if date_value is None:
+                result_list.append(None)
+                valid_list.append(False)
             else:
-                if str_len == 4:
-                    time_format_real = time_format[4]
-                    date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                    if CUtils.equal_ignore_case(date_value, default_date):
-                        return default_date
-                    return CTime.format_str(date_value, '%Y')
-                elif (str_len == 6) or (str_len == 7):
-                    sep_real = ""
-                    sep_list = ['-', '/', '.']
-                    for sep in sep_list:
-                        if sep in date_text:
-                            sep_real = sep
-                            break
-                    time_format_real = time_format[5].format(sep_real)
-                    date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                    if CUtils.equal_ignore_case(date_value, default_date):
-                        return default_date
-                    return CTime.format_str(date_value, '%Y-%m')
-                elif str_len >= 8:
-                    if sign_flag:
-                        sign_real = " "
-                        sign_list = ['CST', 'T']
-                        for sign in sign_list:
-                            if sign in date_text:
-                                sign_real = sign
-                                break
-                        date, time = date_text.split(sign_real)
-                        sep_real = ""
-                        sep_list = ['-', '/', '.']
-                        for sep in sep_list:
-                            if sep in date:
-                                sep_real = sep
-                                break
-                        sec_real = ""
-                        if "." in time:
-                            sec_real = ".%f"
-                        time_format_real = time_format[6].format(sep_real, sign_real, sec_real)
-                        date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                        if CUtils.equal_ignore_case(date_value, default_date):
-                            return default_date
-                        return CTime.format_str(date_value, '%Y-%m-%d %H:%M:%S')
-                    else:
-                        sep_real = ""
-                        sep_list = ['-', '/', '.']
-                        for sep in sep_list:
-                            if sep in date_text:
-                                sep_real = sep
-                                break
-                        time_format_real = time_format[7].format(sep_real)
-                        date_value = CTime.from_datetime_str(date_text, default_date, time_format_real)
-                        if CUtils.equal_ignore_case(date_value, default_date):
-                            return default_date
-                        return CTime.format_str(date_value, '%Y-%m-%d')
+                result_list.append(date_value if return_datetime else CTime.format_str(date_value, datetime_plan[1]))
+                valid_list.append(True)
+        return result_list, valid_list
 
-        except:
-            return default_date
+    @classmethod
+    def datetime_of_format(cls, date_text: str, datetime_format: str):
+        """
+        按strptime的日期格式解析文本, 结果与datetime.strptime一致, 但无法解析时返回None而不抛出异常
+        1. 只支持%Y,%m,%d,%H,%M,%S,%f
+        @param date_text:
+        @param datetime_format:
+        @return:
+        """
+        match_result = _datetime_format_regex(datetime_format).match(date_text)
+        if match_result is None or match_result.end() != len(date_text):
+            return None
+
+        match_dict = match_result.groupdict()
+        microsecond_text = match_dict.get('f')
+        try:
+            return datetime(
+                int(match_dict['Y']),
+                int(match_dict.get('m') or 1),
+                int(match_dict.get('d') or 1),
+                int(match_dict.get('H') or 0),
+                int(match_dict.get('M') or 0),
+                int(match_dict.get('S') or 0),
+                int(microsecond_text.ljust(6, '0')) if microsecond_text else 0
+            )
+        except ValueError:
+            return None
 
     @classmethod
     def text_is_decimal(cls, check_text: str) -> bool:
@@ -903,31 +1168,12 @@ class CUtils(CResource):
         @return:
         """
         text = text.split('.')[0]
-        time_format = "%Y{0}%m{0}%d{1}%H{2}%M{2}%S"
-        sep_real = ""
-        sep_list = ['-', '/']
-        for sep in sep_list:
-            if sep in text:
-                sep_real = sep
-                break
-        # 判断是否带T，GMT
-        sign_real = ""
-        check_text = text.replace(' ', '')
-        sign_list = ['T', 'CST']
-        for sign in sign_list:
-            if sign in check_text:
-                sign_real = sign
-                break
-
-        colon_real = ""
-        if ":" in check_text:
-            colon_real = ":"
-
-        time_format_real = time_format.format(sep_real, sign_real, colon_real)
-        default_date = CTime.now()
-        date_value = CTime.from_datetime_str(check_text, default_date, time_format_real)
-        if CUtils.equal_ignore_case(date_value, default_date):
-            return str(default_date)
+        time_format_real = _text_datetime_format(
+            _Text_Datetime_Kind_DayAndTime, text.translate(_datetime_shape_table)
+        )
+        date_value = cls.datetime_of_format(text.replace(' ', ''), time_format_real)
+        if date_value is None:
+            return str(CTime.now())
         return str(date_value)
 
     @classmethod
@@ -949,8 +1195,12 @@ class CUtils(CResource):
             return []
         if len(list_obj) == 0:
             return []
+        # 已保留的名称的规范化形式, 忽略大小写时相同的名称只保留第一个
+        normalized_name_set = set()
         for list_item in list_obj:
-            if not cls.list_exists(result_list, list_item):
+            normalized_name = cls.normalize_name(list_item)
+            if normalized_name not in normalized_name_set:
+                normalized_name_set.add(normalized_name)
                 result_list.append(list_item)
         return result_list
 
@@ -996,71 +1246,39 @@ class CUtils(CResource):
                 result_list.append(item)
         return result_list
 
-    @classmethod
-    def __single_get_first(cls, text):
-        str1 = text.encode(cls.Encoding_Chinese)
-        try:
-            ord(str1)
-            return text
-        except:
-            asc = str1[0] * 256 + str1[1] - 65536
-            if asc >= -20319 and asc <= -20284:
-                return 'a'
-            if asc >= -20283 and asc <= -19776:
-                return 'b'
-            if asc >= -19775 and asc <= -19219:
-                return 'c'
-            if asc >= -19218 and asc <= -18711:
-                return 'd'
-            if asc >= -18710 and asc <= -18527:
-                return 'e'
-            if asc >= -18526 and asc <= -18240:
-                return 'f'
-            if asc >= -18239 and asc <= -17923:
-                return 'g'
-            if asc >= -17922 and asc <= -17418:
-                return 'h'
-            if asc >= -17417 and asc <= -16475:
-                return 'j'
-            if asc >= -16474 and asc <= -16213:
-                return 'k'
-            if asc >= -16212 and asc <= -15641:
-                return 'l'
-            if asc >= -15640 and asc <= -15166:
-                return 'm'
-            if asc >= -15165 and asc <= -14923:
-                return 'n'
-            if asc >= -14922 and asc <= -14915:
-                return 'o'
-            if asc >= -14914 and asc <= -14631:
-                return 'p'
-            if asc >= -14630 and asc <= -14150:
-                return 'q'
-            if asc >= -14149 and asc <= -14091:
-                return 'r'
-            if asc >= -14090 and asc <= -13119:
-                return 's'
-            if asc >= -13118 and asc <= -12839:
-                return 't'
-            if asc >= -12838 and asc <= -12557:
-                return 'w'
-            if asc >= -12556 and asc <= -11848:
-                return 'x'
-            if asc >= -11847 and asc <= -11056:
-                return 'y'
-            if asc >= -11055 and asc <= -10247:
-                return 'z'
-            return text
-
     @classmethod
     def alpha_text(cls, text):
+        """
+        获取文本的拼音首字母, 如: 影像数据 -> yxsj; 字母转为小写, 去除空格, 其他字符原样保留
+        @param text:
+        @return: 文本为空时返回None
+        """
+        if isinstance(text, str):
+            return _pinyin_initial_text(text)
+
         if cls.equal_ignore_case(text, None):
             return None
-        lst = list(text.lower().strip().replace(' ', ''))
-        char_list = []
-        for each_text in lst:
-            char_list.append(cls.__single_get_first(each_text))
-        return ''.join(char_list)
+        return ''.join(map(_pinyin_initial_of_char, text.lower().strip().replace(' ', '')))
+
+    @classmethod
+    def alpha_text_batch(cls, text_list) -> list:
+        """
+        批量获取文本的拼音首字母, 结果与逐个调用alpha_text一致
+        @param text_list:
+        @return: 与text_list顺序一致的拼音首字母列表
+        """
+        result_dict = dict()
+        result_list = []
+        for text in text_list:
+            if not isinstance(text, str):
+                result_list.append(cls.alpha_text(text))
+                continue
+            result = result_dict.get(text, result_dict)
+            if result is result_dict:
+                result = _pinyin_initial_text(text)
+                result_dict[text] = result
+            result_list.append(result)
+        return result_list
 
     @classmethod
     def conversion_chinese_code(cls, str_text,
@@ -1245,12 +1463,14 @@ class CUtils(CResource):
     def dict_remove(cls, dict_obj: dict, dict_key: str, ignore_case=True):
         if dict_obj is None:
             return
-        if CUtils.list_exists(
-                CUtils.dict_keys(dict_obj),
-                dict_key,
-                ignore_case
-        ):
-            dict_obj.pop(dict_key)
+        if not ignore_case:
+            dict_obj.pop(dict_key, None)
+            return
+
+        # 删除忽略大小写后相同的原始键名
+        key = cls.__dict_key_of_name(dict_obj, dict_key)
+        if key is not cls.__dict_key_not_found:
+            dict_obj.pop(key)
 
     @classmethod
     def dict_same(cls, dict_obj1: dict, dict_obj2: dict) -> bool:
@@ -0,0 +1,117 @@
+"""
+内容: CJson.load_obj性能测试
+1.对比load_obj结构化转换(normalize_obj)与原方式(ujson序列化, 失败时使用demjson, 再解析)的耗时
+2.原方式按修改前的load_obj和load_json_text逐行复现
+3.同时列出当前json后端序列化再解析的耗时, 作为参考
+
+运行: 在项目根目录执行 python -m benchmark.c_json_load_obj
+"""
+
+from __future__ import absolute_import
+
+import timeit
+from decimal import Decimal
+
+import demjson
+import ujson
+
+from base.c_json import CJson
+
+# 使用ensure_ascii=false输出UTF-8, 与原CJson一致
+ensure_ascii = False
+benchmark_count = 10
+benchmark_repeat = 5
+
+
+def load_obj_by_origin(obj):
+    """
+    修改前的load_obj: 先序列化为文本, 再按load_json_text解析
+    :param obj:
+    :return:
+    """
+    # 稳定性保证
+    # noinspection PyBroadException
+    try:
+        temp_obj = ujson.dumps(obj, ensure_ascii=ensure_ascii)
+    except Exception:
+        temp_obj = demjson.encode(obj)
+
+    rt_json_content = temp_obj
+    if rt_json_content is None:
+        rt_json_content = '{}'
+    elif rt_json_content == '':
+        rt_json_content = '{}'
+
+    # noinspection PyBroadException
+    try:
+        json_obj = ujson.loads(rt_json_content)
+    except Exception:
+        # 因为demjson包的接口较强, 所以使用demjson包进行字典转换
+        json_obj = demjson.decode(rt_json_content)
+        # noinspection PyBroadException
+        try:
+            # 因为demjson包转换出的字典存在Decimal函数字典, 无法序列化, 再用ujson转一遍
+            json_obj = ujson.loads(ujson.dumps(json_obj, ensure_ascii=ensure_ascii))
+        except Exception:
+            pass
+    return json_obj
+
+
+def load_obj_by_backend(obj):
+    """
+    使用当前json后端序列化再解析
+    :param obj:
+    :return:
+    """
+    return CJson.json_backend().loads(CJson.json_backend().dumps(obj))
+
+
+def load_obj_by_normalize(obj):
+    """
+    当前的load_obj
+    :param obj:
+    :return:
+    """
+    json = CJson()
+    json.load_obj(obj)
+    return json.json_obj
+
+
+def benchmark_seconds(func, obj) -> float:
+    """
+    单次调用的耗时, 取多轮中最快的一轮, 减少机器负载波动的影响
+    :param func:
+    :param obj:
+    :return:
+    """
+    return min(timeit.repeat(lambda: func(obj), number=benchmark_count, repeat=benchmark_repeat)) / benchmark_count
+
+
+if __name__ == '__main__':
+    benchmark_obj_dict = {
+        'plain': {
+            'application': {'id': 'benchmark', 'title': '性能测试'},
+            'items': [
+                {'id': index, 'name': '数据{0}'.format(index), 'size': index + 0.5,
+                 'tags': ['a', 'b', 'c'], 'extent': {'minx': 1.0, 'maxx': 2.0, 'miny': 3.0, 'maxy': 4.0}}
+                for index in range(10000)
+            ]
+        },
+        'decimal_tuple': {
+            'application': {'id': 'benchmark', 'title': '性能测试'},
+            'items': [
+                {'id': index, 'name': '数据{0}'.format(index), 'size': Decimal('{0}.5'.format(index)),
+                 'count': Decimal(index), 'scale': Decimal('1E+2'),
+                 'tags': ('a', 'b', 'c'), 'extent': {'minx': 1.0, 'maxx': 2.0, 'miny': 3.0, 'maxy': 4.0}}
+                for index in range(10000)
+            ]
+        }
+    }
+
+    print('json backend: {0}'.format(CJson.json_backend().name))
+    for obj_name, benchmark_obj in benchmark_obj_dict.items():
+        print('[{0}]'.format(obj_name))
+        print('  result equal: {0}'.format(load_obj_by_origin(benchmark_obj) == load_obj_by_normalize(benchmark_obj)))
+        print('  origin     : {0:.4f}s'.format(benchmark_seconds(load_obj_by_origin, benchmark_obj)))
+        print('  backend    : {0:.4f}s'.format(benchmark_seconds(load_obj_by_backend, benchmark_obj)))
+        print('  normalize  : {0:.4f}s'.format(benchmark_seconds(load_obj_by_normalize, benchmark_obj)))
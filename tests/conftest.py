@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def file_tree(tmp_path):
+    """
+    测试用的目录树:
+        a.txt(1字节), b.log(2字节)
+        sub/c.txt(3字节), sub/deep/d.txt(4字节)
+        data.txt/e.txt(5字节)  -- 名称与文件匹配符相同的目录
+        empty/
+    """
+    (tmp_path / 'sub' / 'deep').mkdir(parents=True)
+    (tmp_path / 'data.txt').mkdir()
+    (tmp_path / 'empty').mkdir()
+    (tmp_path / 'a.txt').write_text('1')
+    (tmp_path / 'b.log').write_text('22')
+    (tmp_path / 'sub' / 'c.txt').write_text('333')
+    (tmp_path / 'sub' / 'deep' / 'd.txt').write_text('4444')
+    (tmp_path / 'data.txt' / 'e.txt').write_text('55555')
+    return str(tmp_path)
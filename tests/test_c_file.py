@@ -0,0 +1,316 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from base.c_file import CFile, CFileEncodingCache, CFileMatcher
+
+
+def relation_set(root, file_name_list):
+    return {os.path.relpath(file_name, root).replace(os.sep, '/') for file_name in file_name_list}
+
+
+def test_file_or_dir_fullname_of_path_current_dir(file_tree):
+    result = CFile.file_or_dir_fullname_of_path(file_tree)
+    assert relation_set(file_tree, result) == {'a.txt', 'b.log', 'sub', 'data.txt', 'empty'}
+
+
+def test_file_or_dir_fullname_of_path_recurse_matched_subpath_only(file_tree):
+    # 只递归已匹配的子目录
+    result = CFile.file_or_dir_fullname_of_path(file_tree, True, '*.txt')
+    assert relation_set(file_tree, result) == {'a.txt', 'data.txt', 'data.txt/e.txt'}
+
+
+def test_file_or_dir_fullname_of_path_recurse_all_subpath(file_tree):
+    result = CFile.file_or_dir_fullname_of_path(file_tree, False, '*.txt', is_recurse_subpath_all_file=True)
+    assert relation_set(file_tree, result) == {'a.txt', 'data.txt', 'data.txt/e.txt', 'sub/c.txt', 'sub/deep/d.txt'}
+
+
+def test_file_or_dir_fullname_of_path_missing_path(tmp_path):
+    assert CFile.file_or_dir_fullname_of_path(str(tmp_path / 'missing')) == []
+
+
+def test_stat_of_path(file_tree):
+    assert CFile.stat_of_path(file_tree) == (3, 2, 3)
+    assert CFile.stat_of_path(file_tree, True) == (4, 5, 15)
+
+
+def test_iter_variants_match_list_versions(file_tree):
+    assert list(CFile.iter_file_or_subpath_of_path(file_tree, '*.txt')) == \
+        CFile.file_or_subpath_of_path(file_tree, '*.txt')
+    assert list(CFile.iter_file_or_dir_fullname_of_path(file_tree, True)) == \
+        CFile.file_or_dir_fullname_of_path(file_tree, True)
+    assert list(CFile.iter_file_or_subpath_of_path_recurse(file_tree, '*.txt', full_path=True)) == \
+        CFile.file_or_subpath_of_path_recurse(file_tree, '*.txt', full_path=True)
+    assert sorted(CFile.file_or_subpath_of_path_recurse(file_tree, '*.txt')) == \
+        ['a.txt', 'c.txt', 'd.txt', 'data.txt', 'e.txt']
+
+
+def test_iter_variant_is_lazy(file_tree):
+    iterator = CFile.iter_file_or_dir_fullname_of_path(file_tree, True)
+    first = next(iterator)
+    assert os.path.exists(first)
+    iterator.close()
+
+
+def test_stat_of_path_parallel_same_as_serial(file_tree):
+    serial = CFile.stat_of_path(file_tree, True)
+    assert CFile.stat_of_path(file_tree, True, max_workers=4) == serial
+    by_subpath = CFile.stat_of_path_by_subpath(file_tree, True, max_workers=4)
+    assert tuple(map(sum, zip(*by_subpath.values()))) == serial
+
+
+def test_stat_of_path_max_depth(file_tree):
+    # 深度为0时只统计当前目录
+    assert CFile.stat_of_path(file_tree, True, max_depth=0) == CFile.stat_of_path(file_tree)
+    # 深度为1时不统计sub/deep下的文件
+    assert CFile.stat_of_path(file_tree, True, max_depth=1) == (4, 4, 11)
+
+
+def test_file_matcher_common_and_list():
+    matcher = CFileMatcher.of(['*.txt', '*.log'])
+    assert matcher.match('a.txt')
+    assert matcher.match('b.log')
+    assert not matcher.match('c.dat')
+    assert CFileMatcher.of('*').match_all
+    # 相同的匹配字符使用缓存的匹配器
+    assert CFileMatcher.of(['*.txt', '*.log']) is matcher
+    assert CFileMatcher.of(matcher) is matcher
+
+
+def test_file_matcher_regex():
+    matcher = CFileMatcher.of([r'^a\d+$', r'(b)\1'], CFileMatcher.MatchType_Regex)
+    assert matcher.match('a12')
+    assert matcher.match('xbbx')
+    assert not matcher.match('a1b')
+    # 非法的正则表达式视为不匹配
+    assert not CFileMatcher.of('[', CFileMatcher.MatchType_Regex).match('[')
+
+
+def test_file_match_list():
+    assert CFile.file_match_list('a.txt', ['*.log', '*.txt'])
+    assert not CFile.file_match_list('a.txt', ['*.log'])
+
+
+def test_identify_file_encoding_incremental(tmp_path):
+    file_name = str(tmp_path / 'utf8.txt')
+    with open(file_name, 'w', encoding='utf-8') as f:
+        f.write('abc\n' * 1000 + '中文内容, 用于识别编码格式\n' * 50)
+    assert CFile.identify_file_encoding(file_name, use_cache=False).lower() == 'utf-8'
+
+
+def test_file_2_list_small_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(CFile, 'file_read_chunk_size', 5)
+    file_name = str(tmp_path / 'lines.txt')
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        f.write('第一行\n第二行 long line\r\nlast')
+    assert CFile.file_2_list(file_name) == ['第一行\n', '第二行 long line\r\n', 'last']
+    assert CFile.file_2_list(str(tmp_path / 'missing.txt')) is None
+
+
+def test_file_encoding_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(CFile, 'file_encoding_cache', CFileEncodingCache(max_size=2))
+    file_name = str(tmp_path / 'cached.txt')
+    with open(file_name, 'w', encoding='utf-8') as f:
+        f.write('缓存的编码识别结果\n' * 20)
+
+    encoding = CFile.identify_file_encoding(file_name)
+    assert CFile.identify_file_encoding(file_name) == encoding
+    assert CFile.file_encoding_cache.hit_count == 1
+    assert CFile.file_encoding_cache.miss_count == 1
+
+    # 文件大小变化后重新识别
+    with open(file_name, 'a', encoding='utf-8') as f:
+        f.write('追加的内容\n')
+    CFile.identify_file_encoding(file_name)
+    assert CFile.file_encoding_cache.miss_count == 2
+    assert CFile.file_encoding_cache.size == 2
+
+
+def test_file_encoding_cache_evicts_least_recently_used():
+    cache = CFileEncodingCache(max_size=2)
+    cache.put('a', {'encoding': 'utf-8'})
+    cache.put('b', {'encoding': 'gbk'})
+    cache.get('a')
+    cache.put('c', {'encoding': 'ascii'})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'encoding': 'utf-8'}
+
+
+def test_bulk_copy_path_to(file_tree, tmp_path_factory):
+    target = str(tmp_path_factory.mktemp('target'))
+    result, failure_list, copy_stat = CFile.bulk_copy_path_to(file_tree, target, 4)
+    assert result and failure_list == []
+    assert copy_stat['file_count'] == 5
+    assert copy_stat['file_size_sum'] == 15
+    with open(os.path.join(target, 'sub', 'deep', 'd.txt')) as f:
+        assert f.read() == '4444'
+
+
+def test_copy_path_to_raises_and_keeps_source_on_same_path(file_tree):
+    with pytest.raises(shutil.SameFileError):
+        CFile.copy_path_to(file_tree, file_tree)
+    with pytest.raises(shutil.SameFileError):
+        CFile.copy_file_to(os.path.join(file_tree, 'a.txt'), file_tree)
+    with open(os.path.join(file_tree, 'a.txt')) as f:
+        assert f.read() == '1'
+
+    result, failure_list, copy_stat = CFile.bulk_copy_path_to(file_tree, file_tree, 2)
+    assert not result
+    assert len(failure_list) == 5
+    with open(os.path.join(file_tree, 'sub', 'c.txt')) as f:
+        assert f.read() == '333'
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='需要procfs')
+def test_copy_file_to_kernel_copy_returns_zero(tmp_path):
+    # procfs中的文件大小为0, 内核复制直接返回0, 需要改用常规读写
+    CFile.copy_file_to('/proc/self/status', str(tmp_path))
+    assert os.path.getsize(str(tmp_path / 'status')) > 0
+
+
+def test_copy_file_to_empty_file(tmp_path):
+    source = tmp_path / 'empty.txt'
+    source.write_bytes(b'')
+    CFile.copy_file_to(str(source), str(tmp_path / 'target'))
+    assert os.path.getsize(str(tmp_path / 'target' / 'empty.txt')) == 0
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='windows中使用shutil.copyfile')
+def test_copy_file_to_falls_back_when_kernel_copy_copies_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0, raising=False)
+    monkeypatch.setattr(os, 'sendfile', lambda *args: 0, raising=False)
+    source = tmp_path / 'data.bin'
+    source.write_bytes(b'x' * 1000)
+    CFile.copy_file_to(str(source), str(tmp_path / 'target'))
+    assert (tmp_path / 'target' / 'data.bin').read_bytes() == b'x' * 1000
+
+
+def write_resume_journal(source, part_file, data, chunk_size, chunk_count):
+    source_stat = os.stat(source)
+    with open(part_file, 'wb') as f:
+        f.write(data[:chunk_size * chunk_count])
+    with open(part_file + '.journal', 'w') as f:
+        f.write('{0} {1} {2} md5\n'.format(source_stat.st_size, source_stat.st_mtime_ns, chunk_size))
+        for index in range(chunk_count):
+            chunk = data[index * chunk_size:(index + 1) * chunk_size]
+            f.write('{0} {1} {2}\n'.format(index * chunk_size, len(chunk), hashlib.md5(chunk).hexdigest()))
+
+
+def test_resumable_copy_file_to(tmp_path):
+    data = bytes(range(256)) * 10
+    source = tmp_path / 'source.bin'
+    source.write_bytes(data)
+    target = tmp_path / 'target'
+    assert CFile.resumable_copy_file_to(str(source), str(target), chunk_size=100, verify=True)
+    assert (target / 'source.bin').read_bytes() == data
+    assert os.listdir(str(target)) == ['source.bin']
+
+
+def test_resumable_copy_file_to_resumes_after_interruption(tmp_path):
+    data = bytes(range(256)) * 10
+    source = tmp_path / 'source.bin'
+    source.write_bytes(data)
+    target = tmp_path / 'target'
+    target.mkdir()
+    part_file = str(target / 'source.bin.part')
+    # 已复制3个块, 最后一个块的数据已损坏, 将被重新校验并重新复制
+    write_resume_journal(str(source), part_file, data, 100, 3)
+    with open(part_file, 'r+b') as f:
+        f.seek(250)
+        f.write(b'\xff' * 50)
+    assert CFile.resumable_copy_file_to(str(source), str(target), chunk_size=100)
+    assert (target / 'source.bin').read_bytes() == data
+
+
+def test_resumable_copy_file_to_verify_detects_corrupted_chunk(tmp_path):
+    data = bytes(range(256)) * 10
+    source = tmp_path / 'source.bin'
+    source.write_bytes(data)
+    target = tmp_path / 'target'
+    target.mkdir()
+    part_file = str(target / 'source.bin.part')
+    write_resume_journal(str(source), part_file, data, 100, 3)
+    with open(part_file, 'r+b') as f:
+        f.seek(0)
+        f.write(b'\xff')
+    assert not CFile.resumable_copy_file_to(str(source), str(target), chunk_size=100, verify=True)
+    assert CFile.resumable_copy_file_to(str(source), str(target), chunk_size=100, verify=True)
+    assert (target / 'source.bin').read_bytes() == data
+
+
+def build_move_tree(root):
+    (root / 'source' / 'empty').mkdir(parents=True)
+    (root / 'source' / 'sub' / 'deep_empty').mkdir(parents=True)
+    (root / 'source' / 'merge').mkdir()
+    (root / 'source' / 'a.txt').write_text('a')
+    (root / 'source' / 'sub' / 'b.txt').write_text('b')
+    (root / 'source' / 'merge' / 'm.txt').write_text('m')
+    (root / 'outside').mkdir()
+    (root / 'outside' / 'secret.txt').write_text('x')
+    (root / 'target' / 'merge').mkdir(parents=True)
+    (root / 'target' / 'merge' / 'old.txt').write_text('old')
+    if hasattr(os, 'symlink'):
+        os.symlink(str(root / 'outside'), str(root / 'source' / 'link_dir'))
+
+
+def tree_of(path):
+    result = set()
+    for parent_path, sub_paths, sub_files in os.walk(path):
+        for name in sub_paths + sub_files:
+            file_name = os.path.join(parent_path, name)
+            relation_name = os.path.relpath(file_name, path).replace(os.sep, '/')
+            if os.path.islink(file_name):
+                result.add((relation_name, 'link'))
+            elif os.path.isdir(file_name):
+                result.add((relation_name, 'dir'))
+            else:
+                with open(file_name) as f:
+                    result.add((relation_name, f.read()))
+    return result
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink') or os.name == 'nt', reason='需要符号链接')
+@pytest.mark.parametrize('same_device', [True, False])
+def test_move_subpath_and_file_of_path_to(tmp_path, monkeypatch, same_device):
+    build_move_tree(tmp_path)
+    monkeypatch.setattr(CFile, 'same_device', classmethod(lambda cls, path, other_path: same_device))
+    result, failure_list = CFile.move_subpath_and_file_of_path_to(
+        str(tmp_path / 'source'), str(tmp_path / 'target')
+    )
+    assert result and failure_list == []
+    # 同一设备的重命名与跨设备的复制结果一致: 保留空目录, 符号链接按链接本身移动, 不合并链接指向目录的内容
+    assert tree_of(str(tmp_path / 'target')) == {
+        ('a.txt', 'a'), ('empty', 'dir'), ('sub', 'dir'), ('sub/b.txt', 'b'), ('sub/deep_empty', 'dir'),
+        ('merge', 'dir'), ('merge/m.txt', 'm'), ('merge/old.txt', 'old'), ('link_dir', 'link')
+    }
+    assert os.listdir(str(tmp_path / 'source')) == []
+    assert tree_of(str(tmp_path / 'outside')) == {('secret.txt', 'x')}
+
+
+@pytest.mark.skipif(not CFile.proc_fd_supported(), reason='需要/proc/*/fd')
+def test_find_locked_file_in_path(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    open_file = tmp_path / 'sub' / 'open.txt'
+    open_file.write_text('open')
+    (tmp_path / 'closed.txt').write_text('closed')
+
+    # 由其他进程打开文件, 直到标准输入关闭
+    process = subprocess.Popen(
+        [sys.executable, '-c', 'import sys; f = open(sys.argv[1]); print("ready", flush=True); sys.stdin.read()',
+         str(open_file)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+    try:
+        assert process.stdout.readline().strip() == b'ready'
+        assert CFile.file_locked(str(open_file))
+        assert not CFile.file_locked(str(tmp_path / 'closed.txt'))
+        locked_file_list = CFile.find_locked_file_in_path(str(tmp_path), max_workers=2)
+        assert [file_name.strip('/') for file_name in locked_file_list] == ['sub/open.txt']
+    finally:
+        process.stdin.close()
+        process.wait()
+    assert CFile.find_locked_file_in_path(str(tmp_path)) == []
@@ -0,0 +1,409 @@
+import json as std_json
+import os
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip('demjson')
+ujson = pytest.importorskip('ujson')
+jsonpath = pytest.importorskip('jsonpath')
+
+from base.c_file import CFile  # noqa: E402
+from base.c_json import CJson, CJsonParseCache, CJsonStreamReader  # noqa: E402
+
+
+def load_obj_by_round_trip(obj):
+    # 修改前的load_obj: ujson序列化后再解析
+    return ujson.loads(ujson.dumps(obj, ensure_ascii=False))
+
+
+def test_load_obj_same_as_round_trip():
+    obj = {
+        'id': 1, 'name': '数据', 'size': 1.5, 'valid': True, 'memo': None,
+        'tags': ('a', 'b'), 'items': [{'id': 2, 'extent': (1.0, 2.0)}],
+        1: 'int key', 2.5: 'float key', None: 'none key', False: 'bool key'
+    }
+    json = CJson()
+    json.load_obj(obj)
+    assert json.json_obj == load_obj_by_round_trip(obj)
+
+
+def test_load_obj_decimal_to_float():
+    obj = {'a': Decimal('2'), 'b': Decimal('1E+2'), 'c': Decimal('0.5'), 'd': Decimal('1E+400'),
+           Decimal('1.5'): 1}
+    json = CJson()
+    json.load_obj(obj)
+    assert json.json_obj == {'a': 2.0, 'b': 100.0, 'c': 0.5, 'd': float('inf'), '1.5': 1}
+    assert type(json.json_obj['a']) is float
+    assert type(json.json_obj['b']) is float
+
+
+def test_load_obj_copies_the_source():
+    obj = {'items': [{'id': 1}]}
+    json = CJson()
+    json.load_obj(obj)
+    json.json_obj['items'][0]['id'] = 2
+    assert obj['items'][0]['id'] == 1
+
+
+class JsonText:
+    # ujson可以序列化带__json__方法的对象, 结构化转换不支持, 应回退到序列化再解析
+    def __json__(self):
+        return '{"id": 1}'
+
+
+def test_load_obj_falls_back_to_round_trip():
+    obj = {'value': JsonText()}
+    json = CJson()
+    json.load_obj(obj)
+    assert json.json_obj == load_obj_by_round_trip(obj) == {'value': {'id': 1}}
+
+
+@pytest.fixture
+def xpath_json():
+    return CJson.from_obj({
+        'application': {'log': {'level': 'info', 'count': 0}, 'name': ''},
+        'items': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}],
+        'dotted.key': 1
+    })
+
+
+@pytest.mark.parametrize('query', [
+    'application.log.level', '$.application.log.level', 'application.log', 'application.log.count',
+    'application.name', 'items.1.name', 'items.5.name', 'application.missing', 'items.id',
+    'dotted.key', '$.items[*].id', '$..name', '$.items[?(@.id > 1)].name'
+])
+def test_xpath_same_as_jsonpath(xpath_json, query):
+    expected = jsonpath.jsonpath(xpath_json.json_obj, query) or []
+    assert xpath_json.xpath(query) == expected
+
+
+def test_xpath_one(xpath_json):
+    assert xpath_json.xpath_one('application.log.level', 'debug') == 'info'
+    assert xpath_json.xpath_one('application.log.count', 1) == 0
+    assert xpath_json.xpath_one('application.missing', 'debug') == 'debug'
+    assert xpath_json.xpath_one('$.items[*].id', None) == 1
+
+
+def test_simple_json_path_segments():
+    assert CJson.simple_json_path_segments('application.log.level') == ('application', 'log', 'level')
+    assert CJson.simple_json_path_segments('$.items.0') == ('items', '0')
+    assert CJson.simple_json_path_segments('$.items[*].id') is None
+    assert CJson.simple_json_path_segments('$..name') is None
+
+
+def test_set_value_of_name_in_place():
+    json = CJson.from_obj({'application': {'log': {'level': 'info'}, 'items': [{'id': 1}, {'id': 2}]}})
+    log_obj = json.json_obj['application']['log']
+    json.set_value_of_name('application.log.level', 'debug')
+    json.set_value_of_name('application.items.1.id', 3)
+    json.set_value_of_name('application.items.-1.name', 'last')
+    # 已有的子节点直接修改, 不复制
+    assert json.json_obj['application']['log'] is log_obj
+    assert json.json_obj == {
+        'application': {'log': {'level': 'debug'}, 'items': [{'id': 1}, {'id': 3, 'name': 'last'}]}
+    }
+
+
+def test_set_value_of_name_creates_missing_nodes():
+    json = CJson.from_obj({'application': 'text'})
+    json.set_value_of_name('application.log.level', 'debug')
+    json.set_value_of_name('id', 1)
+    assert json.json_obj == {'application': {'log': {'level': 'debug'}}, 'id': 1}
+
+
+def test_json_path_helpers():
+    json_text = '{"application": {"log": {"level": "info"}}, "items": [{"id": 1}, {"id": 2}]}'
+    assert CJson.json_path(json_text, 'application.log.level') == ['info']
+    assert CJson.json_path(json_text, '$.items[*].id') == [1, 2]
+    assert CJson.json_path_one(json_text, 'application.log.level', 'debug') == 'info'
+    assert CJson.json_path_one(json_text, 'application.missing', 'debug') == 'debug'
+    assert CJson.json_attr_value(json_text, '$.items[1].id', 0) == 2
+    assert CJson.json_path_many(json_text, ['application.log.level', '$.items[*].id', 'missing']) == \
+        [['info'], [1, 2], []]
+    assert CJson.json_path_many('', ['application', 'items']) == [[], []]
+    assert CJson.json_path(None, 'application') == []
+    assert CJson.json_path_one('', 'application', 'default') == 'default'
+
+
+def test_json_path_results_do_not_change_cache():
+    json_text = '{"application": {"log": {"level": "info"}}}'
+    CJson.json_path_one(json_text, 'application.log', None)['level'] = 'debug'
+    CJson.json_path(json_text, 'application')[0]['log'] = None
+    assert CJson.json_path_one(json_text, 'application.log.level', None) == 'info'
+
+
+def test_json_set_attr_does_not_change_cache():
+    json_text = '{"application": {"log": {"level": "info"}}}'
+    assert CJson.json_path_one(json_text, 'application.log.level', None) == 'info'
+    new_json_text = CJson.json_set_attr(json_text, 'application.log.level', 'debug')
+    assert CJson.json_path_one(new_json_text, 'application.log.level', None) == 'debug'
+    assert CJson.json_path_one(json_text, 'application.log.level', None) == 'info'
+
+
+def test_json_parse_cache_hit_and_miss(monkeypatch):
+    monkeypatch.setattr(CJson, 'json_parse_cache', CJsonParseCache())
+    json_text = '{"id": 1}'
+    assert CJson.json_path_one(json_text, 'id', None) == 1
+    assert CJson.json_path_one(json_text, 'id', None) == 1
+    assert CJson.json_parse_cache.miss_count == 1
+    assert CJson.json_parse_cache.hit_count == 1
+
+
+def test_json_parse_cache_bounds():
+    cache = CJsonParseCache(max_size=3, max_text_length=10, max_total_text_length=20)
+    cache.put('x' * 11, {})
+    assert cache.size == 0
+
+    for index in range(4):
+        cache.put(str(index) * 5, {'id': index})
+    # 按记录个数淘汰最久未使用的记录
+    assert cache.size == 3
+    assert cache.get('00000') is None
+    assert cache.total_text_length == 15
+
+    cache.put('4' * 10, {'id': 4})
+    # 按文本总长度淘汰
+    assert cache.total_text_length <= 20
+    assert cache.get('4' * 10) == {'id': 4}
+    assert cache.get('11111') is None
+
+    cache.clear()
+    assert cache.size == 0
+    assert cache.total_text_length == 0
+
+
+stream_json_obj = {
+    'type': 'FeatureCollection',
+    'meta': {'title': '要素 "集合"', 'escape': '\\u4e2d\n', 'empty': [], 'items': {}},
+    'data': {'features': [
+        {'id': index, 'name': '要素{0}'.format(index), 'value': index * 1.5, 'valid': index % 2 == 0,
+         'memo': None, 'geometry': {'coordinates': [[index, -index], [1e10, -2.5e-3]]},
+         **({'tag': 'key'} if index % 5 == 0 else {})}
+        for index in range(20)
+    ]}
+}
+
+
+@pytest.fixture(params=[1, 7, 64 * 1024], ids=['chunk_1', 'chunk_7', 'chunk_default'])
+def stream_json_file(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(CFile, 'file_read_chunk_size', request.param)
+    file_name = str(tmp_path / 'features.json')
+    with open(file_name, 'w', encoding='utf-8') as f:
+        f.write(std_json.dumps(stream_json_obj, ensure_ascii=False, indent=2))
+    return file_name
+
+
+def test_iter_file(stream_json_file):
+    features = stream_json_obj['data']['features']
+    assert list(CJson.iter_file(stream_json_file, 'data.features')) == features
+    assert list(CJson.iter_file(stream_json_file, '$.data.features')) == features
+    assert list(CJson.iter_file(stream_json_file, 'data.features', 'tag')) == features[::5]
+    assert list(CJson.iter_file(stream_json_file, 'meta')) == [stream_json_obj['meta']]
+    assert list(CJson.iter_file(stream_json_file, 'meta.empty')) == []
+    assert list(CJson.iter_file(stream_json_file, 'data.missing')) == []
+    assert list(CJson.iter_file(stream_json_file, 'data.features.3.geometry.coordinates')) == \
+        features[3]['geometry']['coordinates']
+
+
+def test_iter_file_root_array(tmp_path):
+    file_name = str(tmp_path / 'items.json')
+    with open(file_name, 'w', encoding='utf-8') as f:
+        f.write(' [1, "二", {"a": [true, false, null]}, -0.5e+2] ')
+    assert list(CJson.iter_file(file_name)) == [1, '二', {'a': [True, False, None]}, -50.0]
+    assert list(CJson.iter_file(str(tmp_path / 'missing.json'))) == []
+
+
+def test_iter_file_rejects_complex_item_path(stream_json_file):
+    with pytest.raises(Exception):
+        list(CJson.iter_file(stream_json_file, '$.data.features[*]'))
+
+
+def test_stream_reader_single_char_chunks():
+    json_text = std_json.dumps(stream_json_obj, ensure_ascii=False)
+    reader = CJsonStreamReader(iter(json_text))
+    assert reader.read_value() == stream_json_obj
+
+
+def test_stream_reader_invalid_json():
+    reader = CJsonStreamReader(iter(['[1, 2', ' 3]']))
+    with pytest.raises(ValueError):
+        list(reader.iter_items())
+
+
+def test_iter_ndjson(tmp_path):
+    file_name = str(tmp_path / 'items.ndjson')
+    with open(file_name, 'w', encoding='utf-8') as f:
+        f.write('{"id": 1, "name": "一"}\n\n{"id": 2}\r\n  \n{"id": 3}')
+    assert list(CJson.iter_ndjson(file_name)) == [{'id': 1, 'name': '一'}, {'id': 2}, {'id': 3}]
+    assert list(CJson.iter_ndjson(file_name, 'name')) == [{'id': 1, 'name': '一'}]
+
+
+def test_to_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(CJson, 'stream_container_min_size', 2)
+    obj = {'application': {'title': '测试', 'items': [1, 2, {'a': None}]}, 'values': list(range(10)),
+           1: 'int key'}
+    file_name = str(tmp_path / 'sub' / 'result.json')
+    CJson.from_obj(obj).to_file(file_name)
+    with open(file_name, encoding='utf-8') as f:
+        assert std_json.load(f) == load_obj_by_round_trip(obj)
+    # 临时文件已替换为目标文件
+    assert os.listdir(str(tmp_path / 'sub')) == ['result.json']
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='文件权限只在posix下检查')
+def test_to_file_mode(tmp_path):
+    file_name = str(tmp_path / 'result.json')
+    old_umask = os.umask(0o027)
+    try:
+        CJson.from_obj({'id': 1}).to_file(file_name)
+    finally:
+        os.umask(old_umask)
+    assert os.stat(file_name).st_mode & 0o777 == 0o640
+
+    # 覆盖已有文件时保留原文件的权限
+    os.chmod(file_name, 0o600)
+    CJson.from_obj({'id': 2}).to_file(file_name)
+    assert os.stat(file_name).st_mode & 0o777 == 0o600
+    assert CJson.from_file(file_name).json_obj == {'id': 2}
+
+
+def test_to_file_keeps_target_when_write_fails(tmp_path):
+    file_name = str(tmp_path / 'result.json')
+    CJson.from_obj({'id': 1}).to_file(file_name)
+
+    def items_with_error():
+        yield {'id': 2}
+        raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        CJson.items_2_ndjson_file(items_with_error(), file_name)
+    assert CJson.from_file(file_name).json_obj == {'id': 1}
+    assert os.listdir(str(tmp_path)) == ['result.json']
+
+
+def test_to_file_ndjson(tmp_path):
+    file_name = str(tmp_path / 'items.ndjson')
+    CJson.from_obj([{'id': 1}, {'id': 2, 'name': '二'}]).to_file(file_name, ndjson=True)
+    with open(file_name, encoding='utf-8') as f:
+        assert f.read() == '{"id":1}\n{"id":2,"name":"二"}\n'
+    assert list(CJson.iter_ndjson(file_name)) == [{'id': 1}, {'id': 2, 'name': '二'}]
+
+
+def test_items_2_ndjson_file_from_iterator(stream_json_file, tmp_path):
+    file_name = str(tmp_path / 'features.ndjson')
+    CJson.items_2_ndjson_file(CJson.iter_file(stream_json_file, 'data.features'), file_name)
+    assert list(CJson.iter_ndjson(file_name)) == stream_json_obj['data']['features']
+
+
+def test_str_2_file_writes_text_through(tmp_path):
+    file_name = str(tmp_path / 'result.json')
+    json_text = '{"id": 12345678901234567890, "name": "原文"}'
+    loads_count = CJson.json_backend().loads_count
+    CJson.str_2_file(json_text, file_name)
+    assert CJson.json_backend().loads_count == loads_count
+    with open(file_name, encoding='utf-8') as f:
+        assert f.read() == json_text
+
+
+def test_str_2_file_normalizes_lenient_text_and_objects(tmp_path):
+    file_name = str(tmp_path / 'result.json')
+    CJson.str_2_file("{'id': 1}", file_name)
+    assert CJson.from_file(file_name).json_obj == {'id': 1}
+    CJson.str_2_file('', file_name)
+    assert CJson.from_file(file_name).json_obj == {}
+    CJson.str_2_file({'id': Decimal('2')}, file_name)
+    assert CJson.from_file(file_name).json_obj == {'id': 2.0}
+
+
+@pytest.fixture(params=[CJson.Backend_UJson, CJson.Backend_OrJson, CJson.Backend_Json])
+def json_backend_name(request):
+    backend = CJson.json_backend()
+    try:
+        CJson.set_json_backend(request.param)
+    except Exception:
+        pytest.skip('json编解码后端[{0}]未安装'.format(request.param))
+    yield request.param
+    CJson.set_json_backend(backend.name)
+
+
+@pytest.mark.parametrize('json_text, expected', [
+    ('{"id": 12345678901234567890123}', {'id': 12345678901234567890123}),
+    ('{"id": -9223372036854775809}', {'id': -9223372036854775809}),
+    ('{"id": 9223372036854775807}', {'id': 9223372036854775807}),
+    ('{"text": "\\ud800"}', {'text': '\ud800'}),
+    ('{"value": 1e400}', {'value': float('inf')}),
+    ('{"name": "名称", "items": [1.5, true, null]}', {'name': '名称', 'items': [1.5, True, None]})
+])
+def test_json_backend_loads_lossless(json_backend_name, json_text, expected):
+    json = CJson()
+    json.load_json_text(json_text)
+    assert json.json_obj == expected
+    assert CJson.json_backend().name == json_backend_name
+
+
+@pytest.mark.parametrize('obj', [
+    {'id': 2 ** 70}, {'id': -2 ** 64}, {'name': '名称', 'items': [1.5, True, None]}, [{'a': [1, {'b': 2}]}]
+])
+def test_json_backend_dumps_round_trip(json_backend_name, obj):
+    json_text = CJson.from_obj(obj).to_json()
+    assert std_json.loads(json_text) == obj
+    assert '名称' in json_text or '名称' not in str(obj)
+
+
+def test_json_backend_dumps_non_str_keys_and_decimal(json_backend_name):
+    backend = CJson.json_backend()
+    assert std_json.loads(backend.dumps({1: Decimal('1.5')})) == {'1': 1.5}
+    assert std_json.loads(backend.dumps({'id': 1}, 2)) == {'id': 1}
+
+
+def test_set_json_backend_rejects_unavailable_backend():
+    backend = CJson.json_backend()
+    with pytest.raises(Exception):
+        CJson.set_json_backend(CJson.Backend_DemJson)
+    with pytest.raises(Exception):
+        CJson.set_json_backend('missing')
+    assert CJson.json_backend() is backend
+
+
+def test_json_backend_stat(json_backend_name):
+    loads_count = CJson.json_backend_stat()[json_backend_name]['loads_count']
+    CJson.from_obj('{"id": 1}')
+    stat = CJson.json_backend_stat()
+    assert stat[json_backend_name]['loads_count'] == loads_count + 1
+    assert CJson.Backend_DemJson in stat
+
+
+@pytest.mark.parametrize('json_text, expected', [
+    ("{'id': 1}", True), ('{id: 1}', True), ('  {\n  name: "a"}', True), ("['a']", True),
+    ('// comment\n{}', True), ('{"id": 1}', False), ('[1, 2]', False), ('"text"', False)
+])
+def test_is_lenient_json_by_prefix(json_text, expected):
+    assert CJson.is_lenient_json(json_text) == expected
+
+
+def test_lenient_json_goes_straight_to_demjson():
+    stat = CJson.json_backend_stat()
+    json = CJson()
+    json.load_json_text("{'id': 1, 'value': 1.5, 'items': ['a', 2]}")
+    assert json.json_obj == {'id': 1, 'value': 1.5, 'items': ['a', 2]}
+    assert type(json.json_obj['value']) is float
+    new_stat = CJson.json_backend_stat()
+    backend_name = CJson.json_backend().name
+    assert new_stat[backend_name]['loads_count'] == stat[backend_name]['loads_count']
+    assert new_stat[CJson.Backend_DemJson]['loads_count'] == stat[CJson.Backend_DemJson]['loads_count'] + 1
+
+
+def test_lenient_json_verdict_is_remembered():
+    json_text = '{"id": 1, "items": [1, 2,]}'
+    assert not CJson.is_lenient_json(json_text)
+    json = CJson()
+    json.load_json_text(json_text)
+    assert json.json_obj == {'id': 1, 'items': [1, 2]}
+    # 按标准json解析失败一次后, 再次解析时直接使用宽松的解析方式
+    assert CJson.is_lenient_json(json_text)
+    backend_name = CJson.json_backend().name
+    loads_count = CJson.json_backend_stat()[backend_name]['loads_count']
+    json.load_json_text(json_text)
+    assert json.json_obj == {'id': 1, 'items': [1, 2]}
+    assert CJson.json_backend_stat()[backend_name]['loads_count'] == loads_count
@@ -0,0 +1,177 @@
+import json as std_json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('demjson')
+
+from base.c_json import CJson  # noqa: E402
+from base.c_settings import CSettings  # noqa: E402
+
+
+def write_json(file_name, obj):
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    with open(file_name, 'w', encoding='utf-8') as f:
+        std_json.dump(obj, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def settings_home(tmp_path, monkeypatch):
+    """
+    测试用的应用目录: app/version/project/base.json, app/version/settings/template/local.json
+    """
+    app_dir = tmp_path / 'app'
+    config_dir = app_dir / 'version'
+    write_json(str(config_dir / 'project' / 'base.json'), {
+        'application': {'log': {'level': 'info', 'path': 'logs'}, 'debug': 'false', 'id': 'base'},
+        'switch': {'metadata': 'off'},
+        'items': [{'id': 1}, {'id': 2}]
+    })
+    # 后面的include配置按顶层节点覆盖前面的配置
+    write_json(str(config_dir / 'settings' / 'template' / 'local.json'), {
+        'switch': {'metadata': 'on', 'view': 'off'},
+        'local': {'id': 'local', 'dotted.key': 1}
+    })
+
+    monkeypatch.setenv('TSDB_HOME', str(app_dir))
+    for environ_name in ('GDAL_FILENAME_IS_UTF8', 'SHAPE_ENCODING', 'JPEGMEM', 'PROJ_LIB', 'GDAL_DATA'):
+        monkeypatch.delenv(environ_name, raising=False)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    monkeypatch.setattr(CSettings, 'include_cache_path', str(tmp_path / 'cache'))
+    return str(app_dir)
+
+
+def new_settings():
+    return CSettings({'include': ['base', 'local.json']})
+
+
+def test_settings_include(settings_home):
+    settings = new_settings()
+    assert settings.xpath_one('application.id', None) == 'base'
+    assert settings.xpath_one('application.log.level', None) == 'info'
+    assert settings.xpath_one('local.id', None) == 'local'
+    assert settings.xpath_one('switch', None) == {'metadata': 'on', 'view': 'off'}
+    assert settings.xpath_one('application.name', None) == 'app'
+    assert settings.xpath_one('application.directory', None) == settings_home
+
+
+@pytest.mark.parametrize('query', [
+    'application.log.level', '$.application.log.level', 'application.log', 'items.1.id', 'items.01.id',
+    'items.5.id', 'application.missing', 'application.log.level.missing', '$.items[*].id', '$..id',
+    'local.dotted.key', "$.local['dotted.key']", 'include'
+])
+def test_frozen_xpath_same_as_unfrozen(settings_home, query):
+    settings = new_settings()
+    expected = settings.xpath(query)
+    settings.freeze()
+    assert settings.is_frozen()
+    assert settings.xpath(query) == expected
+
+
+def test_frozen_settings_queries(settings_home):
+    settings = new_settings()
+    settings.freeze()
+    assert settings.get_logger_level() == 'info'
+    assert settings.get_logger_path() == 'logs'
+    assert settings.switch_is_on('switch', 'metadata')
+    assert not settings.switch_is_on('switch', 'view')
+    assert settings.switch_is_on('switch', 'missing')
+    assert settings.xpath_one('application.missing', 'default') == 'default'
+
+
+def test_frozen_settings_are_read_only(settings_home):
+    settings = new_settings()
+    assert not settings.is_frozen()
+    settings.set_logger('other_logs')
+    settings.freeze()
+    assert settings.get_logger_path() == 'other_logs'
+    with pytest.raises(Exception):
+        settings.set_value_of_name('application.id', 'changed')
+    with pytest.raises(Exception):
+        settings.set_logger('logs')
+    with pytest.raises(Exception):
+        settings.load_obj({'id': 1})
+    with pytest.raises(Exception):
+        settings.load_json_text('{"id": 1}')
+    assert settings.xpath_one('application.id', None) == 'base'
+
+
+@pytest.fixture
+def include_load_list(monkeypatch):
+    """
+    记录解析include配置文件的文件名, 并清空进程内的include缓存
+    """
+    monkeypatch.setattr(CSettings, '_CSettings__include_cache_dict', dict())
+    load_list = []
+    from_file = CJson.from_file
+
+    def from_file_logged(filename):
+        load_list.append(os.path.basename(filename))
+        return from_file(filename)
+
+    monkeypatch.setattr(CJson, 'from_file', from_file_logged)
+    return load_list
+
+
+def config_file_name_set(settings_home):
+    return {
+        os.path.relpath(os.path.join(path, file_name), settings_home).replace(os.sep, '/')
+        for path, dir_list, file_name_list in os.walk(settings_home) for file_name in file_name_list
+    }
+
+
+def test_include_cache_in_process(settings_home, include_load_list):
+    settings = new_settings()
+    assert sorted(include_load_list) == ['base.json', 'local.json']
+    new_settings_obj = new_settings()
+    assert sorted(include_load_list) == ['base.json', 'local.json']
+    assert new_settings_obj.json_obj == settings.json_obj
+
+
+def test_include_cache_file(settings_home, include_load_list, monkeypatch):
+    settings = new_settings()
+    # 缓存文件写入缓存目录, 不写入应用的配置目录
+    assert config_file_name_set(settings_home) == {
+        'version/project/base.json', 'version/settings/template/local.json'
+    }
+    assert len(os.listdir(CSettings.include_cache_path)) == 1
+
+    # 新的进程: 进程内缓存为空, 从缓存文件读取合并结果
+    monkeypatch.setattr(CSettings, '_CSettings__include_cache_dict', dict())
+    include_load_list.clear()
+    assert new_settings().json_obj == settings.json_obj
+    assert include_load_list == []
+
+
+def test_include_cache_invalidated_by_changed_file(settings_home, include_load_list, monkeypatch):
+    assert new_settings().xpath_one('local.id', None) == 'local'
+    write_json(os.path.join(settings_home, 'version', 'settings', 'template', 'local.json'), {
+        'local': {'id': 'changed local'}
+    })
+    include_load_list.clear()
+    assert new_settings().xpath_one('local.id', None) == 'changed local'
+    assert sorted(include_load_list) == ['base.json', 'local.json']
+
+    monkeypatch.setattr(CSettings, '_CSettings__include_cache_dict', dict())
+    include_load_list.clear()
+    assert new_settings().xpath_one('local.id', None) == 'changed local'
+    assert include_load_list == []
+
+
+def test_include_cache_file_disabled_or_not_writable(settings_home, include_load_list, monkeypatch, tmp_path):
+    monkeypatch.setattr(CSettings, 'include_cache_path', None)
+    assert new_settings().xpath_one('local.id', None) == 'local'
+    assert not os.path.exists(str(tmp_path / 'cache'))
+
+    # 缓存目录无法创建时, 不影响配置的加载
+    blocked_path = tmp_path / 'blocked'
+    blocked_path.write_text('')
+    monkeypatch.setattr(CSettings, 'include_cache_path', str(blocked_path / 'cache'))
+    monkeypatch.setattr(CSettings, '_CSettings__include_cache_dict', dict())
+    assert new_settings().xpath_one('local.id', None) == 'local'
+
+
+def test_include_file_not_found(settings_home):
+    with pytest.raises(Exception):
+        CSettings({'include': ['base', 'missing']})
@@ -0,0 +1,227 @@
+from datetime import datetime
+
+import pytest
+
+from base.c_utils import CDictKeyIndex, CUtils
+
+
+def dict_value_by_scan(dict_obj, name, default_value):
+    # 修改前的dict_value_by_name: 逐个比较键名
+    for key in dict_obj.keys():
+        if CUtils.equal_ignore_case(key, name):
+            return dict_obj[key]
+    return default_value
+
+
+@pytest.fixture(params=[1, 1000000], ids=['key_index', 'scan'])
+def dict_key_index_min_size(request, monkeypatch):
+    monkeypatch.setattr(CUtils, 'dict_key_index_min_size', request.param)
+    return request.param
+
+
+def test_dict_value_by_name(dict_key_index_min_size):
+    dict_obj = {'Name': 1, ' name ': 2, 'ID': 3, 'title ': 4}
+    for name in ['name', 'NAME ', 'id', 'Title', 'missing', '']:
+        assert CUtils.dict_value_by_name(dict_obj, name, None) == dict_value_by_scan(dict_obj, name, None)
+    assert CUtils.dict_value_by_name(dict_obj, 'Name', None, False) == 1
+    assert CUtils.dict_value_by_name(dict_obj, 'NAME', 'default', False) == 'default'
+    assert CUtils.dict_value_by_name(None, 'name', 'default') == 'default'
+
+
+def test_dict_value_by_name_after_dict_changed(dict_key_index_min_size):
+    dict_obj = {'Name': 1, 'ID': 2}
+    assert CUtils.dict_value_by_name(dict_obj, 'name', None) == 1
+
+    # 增删键名后字典长度不变
+    del dict_obj['Name']
+    dict_obj['Title'] = 3
+    assert CUtils.dict_value_by_name(dict_obj, 'name', None) is None
+    assert CUtils.dict_value_by_name(dict_obj, 'title', None) == 3
+
+    # 删除重复名称中的第一个后, 应返回剩余的键名
+    dict_obj = {'Name': 1, 'NAME': 2, 'ID': 3}
+    assert CUtils.dict_value_by_name(dict_obj, 'name', None) == 1
+    del dict_obj['Name']
+    dict_obj['Title'] = 4
+    assert CUtils.dict_value_by_name(dict_obj, 'name', None) == 2
+
+    # 删除后重新加入, 字典中的键名顺序变化
+    dict_obj = {'NAME': 1, 'Name': 2}
+    assert CUtils.dict_value_by_name(dict_obj, 'name', None) == 1
+    dict_obj['NAME'] = dict_obj.pop('NAME')
+    assert CUtils.dict_value_by_name(dict_obj, 'name', None) == 2
+
+
+def test_dict_value_by_name_reused_dict_id(dict_key_index_min_size):
+    # 字典释放后, 新字典可能复用相同的id
+    for index in range(100):
+        dict_obj = {'Key{0}'.format(index): index, 'ID': index}
+        assert CUtils.dict_value_by_name(dict_obj, 'key{0}'.format(index), None) == index
+        assert CUtils.dict_value_by_name(dict_obj, 'key{0}'.format(index - 1), None) is None
+        del dict_obj
+
+
+def test_dict_key_index():
+    dict_obj = {'Name': 1, 'NAME': 2, 'ID': 3}
+    key_index = CDictKeyIndex(dict_obj)
+    assert key_index.key_of_name(dict_obj, 'name', None) == 'Name'
+    assert key_index.key_of_name(dict_obj, 'id', None) == 'ID'
+    assert key_index.key_of_name(dict_obj, 'missing', None) is None
+    dict_obj['Title'] = 4
+    assert key_index.key_of_name(dict_obj, 'id', None) is CDictKeyIndex.Key_Index_Invalid
+    del dict_obj['ID']
+    assert key_index.key_of_name(dict_obj, 'id', None) is CDictKeyIndex.Key_Index_Invalid
+    assert key_index.key_of_name(dict_obj, 'missing', None) is CDictKeyIndex.Key_Index_Invalid
+
+
+def test_dict_xpath_and_remove(dict_key_index_min_size):
+    dict_obj = {'Application': {'Log': {'Level': 'info'}}, 'Name': 1, 'name': 2}
+    assert CUtils.dict_xpath(dict_obj, 'application.log.level', None) == 'info'
+    assert CUtils.dict_xpath(dict_obj, 'application.missing.level', 'default') == 'default'
+
+    CUtils.dict_remove(dict_obj, 'NAME')
+    assert dict_obj == {'Application': {'Log': {'Level': 'info'}}, 'name': 2}
+    CUtils.dict_remove(dict_obj, 'NAME')
+    assert dict_obj == {'Application': {'Log': {'Level': 'info'}}}
+    CUtils.dict_remove(dict_obj, 'application', False)
+    assert dict_obj == {'Application': {'Log': {'Level': 'info'}}}
+    CUtils.dict_remove(dict_obj, 'Application', False)
+    assert dict_obj == {}
+
+
+def test_name_index_same_as_list_functions():
+    list_obj = ['Name', ' name ', 'ID', None, 1, 'title']
+    name_index = CUtils.list_name_index(list_obj)
+    for name in ['name', 'NAME ', 'id', 'Title', None, '', 1, '1', 'missing']:
+        assert name_index.exists(name) == CUtils.list_exists(list_obj, name)
+        assert name_index.index_of(name) == CUtils.list_index_of(list_obj, name)
+        assert name_index.count(name) == CUtils.list_count(list_obj, name)
+    assert not CUtils.list_name_index(None).exists('name')
+
+
+def test_list_exists_many():
+    list_obj = ['Name', 'ID', 'title']
+    name_list = ['name', 'ID', 'Title ', 'missing']
+    assert CUtils.list_exists_many(list_obj, name_list) == [True, True, True, False]
+    assert CUtils.list_exists_many(list_obj, name_list, False) == [False, True, False, False]
+    # 不可哈希的元素
+    assert CUtils.list_exists_many([['a'], 'b'], [['a'], 'c'], False) == [True, False]
+    assert CUtils.list_exists_many(None, name_list) == [False, False, False, False]
+
+
+def test_list_clear_same_string():
+    assert CUtils.list_clear_same_string(['Name', 'ID', ' name', 'id', 'title', 'Name']) == ['Name', 'ID', 'title']
+    assert CUtils.list_clear_same_string([None, '', 1, '1']) == [None, 1]
+    assert CUtils.list_clear_same_string([]) == []
+    assert CUtils.list_clear_same_string(None) == []
+
+
+standard_datetime_list = [
+    ('2020', '2020'), ('2020年', '2020'), ('202010', '2020-10'), ('2020-10', '2020-10'), ('2020/10', '2020-10'),
+    ('2020年10月', '2020-10'), ('2020年1月', '2020-01'), ('20201022', '2020-10-22'), ('2020-10-22', '2020-10-22'),
+    ('2020/10/22', '2020-10-22'), ('2020.10.22', '2020-10-22'), ('2020-1-2', '2020-01-02'),
+    ('2020年10月22日', '2020-10-22'), ('2020-10-22 22:22:22', '2020-10-22 22:22:22'),
+    ('2020-10-22 22:22:22.345', '2020-10-22 22:22:22'), ('2020-10-22T22:22:22.000007', '2020-10-22 22:22:22'),
+    ('2020/10/22 22:22:22', '2020-10-22 22:22:22'), ('20201022 22:22:22', '2020-10-22 22:22:22'),
+    ('2020年10月22日 22:22:22', '2020-10-22 22:22:22'), ('2020-10-22CST22:22:22', '2020-10-22 22:22:22'),
+    ('2020-13-01', 'default'), ('2020-02-30', 'default'), ('2020-10-22 25:00:00', 'default'),
+    ('1999-12-31 23:59:60', 'default'), ('abc', None), ('', None), ('20', None), (2020, '2020'), (None, None)
+]
+
+
+@pytest.mark.parametrize('date_text, expected', standard_datetime_list)
+def test_standard_datetime_format(date_text, expected):
+    assert CUtils.standard_datetime_format(date_text, 'default') == expected
+
+
+def test_standard_datetime_format_batch():
+    date_text_list = [date_text for date_text, expected in standard_datetime_list] * 3
+    result_list, valid_list = CUtils.standard_datetime_format_batch(date_text_list)
+    for date_text, result, valid in zip(date_text_list, result_list, valid_list):
+        expected = CUtils.standard_datetime_format(date_text, 'default')
+        if expected in (None, 'default'):
+            assert result is None and not valid
+        else:
+            assert result == expected and valid
+
+    result_list, valid_list = CUtils.standard_datetime_format_batch(['2020-10-22 22:22:22.5', 'abc'], True)
+    assert result_list == [datetime(2020, 10, 22, 22, 22, 22, 500000), None]
+    assert valid_list == [True, False]
+
+
+@pytest.mark.parametrize('date_text, datetime_format', [
+    ('2020-10-22', '%Y-%m-%d'), ('2020-1-2', '%Y-%m-%d'), ('2020-10-22 22:22:22.000007', '%Y-%m-%d %H:%M:%S.%f'),
+    ('2020-10-22 22:22:22.5', '%Y-%m-%d %H:%M:%S.%f'), ('20201022T222222', '%Y%m%dT%H%M%S'),
+    ('2020年10月', '%Y年%m月'), ('2020-10-22t22:22:22', '%Y-%m-%dT%H:%M:%S'), ('2020-10-22  22:22', '%Y-%m-%d %H:%M'),
+    ('2020-02-30', '%Y-%m-%d'), ('2020-10-22x', '%Y-%m-%d'), ('2020-10', '%Y-%m-%d'), ('20-10-22', '%Y-%m-%d')
+])
+def test_datetime_of_format_same_as_strptime(date_text, datetime_format):
+    try:
+        expected = datetime.strptime(date_text, datetime_format)
+    except ValueError:
+        expected = None
+    assert CUtils.datetime_of_format(date_text, datetime_format) == expected
+
+
+# 文本 -> 结果为True的判断方法
+text_is_date_dict = {
+    '2020': {'date', 'year'},
+    '202010': {'date', 'month', 'month_nosep'},
+    '2020-10': {'date', 'month'},
+    '2020/10': {'date', 'month'},
+    '20201022': {'date', 'day'},
+    '2020-10-22': {'date', 'day'},
+    '2020/10/22': {'date', 'day'},
+    '2020-1-2': {'date', 'day'},
+    '2020-10-22 22:22:22': {'datetime'},
+    '2020-10-22 22:22:22.345': {'datetime'},
+    '2020-10-22T22:22:22.000007': {'datetime'},
+    '2020/10/22 22:22:22': {'datetime'},
+    '20201022 22:22:22': {'datetime'},
+    '20201022222222': {'datetime'},
+    '2020-10-22T22:22:22Z': {'datetime'},
+    '2020-10-22T22:22:22.5Z': {'datetime'},
+    '2020年': set(), '2020年10月': set(), '2020.10.22': set(), '2020-13-01': set(), '2020-02-30': set(),
+    '2020-10-22 25:00:00': set(), '2020-10-22 22:22': set(), '2020-10-22Z': set(), 'abc': set(), '': set(),
+    '20': set()
+}
+
+
+@pytest.mark.parametrize('check_text', list(text_is_date_dict))
+def test_text_is_date(check_text):
+    expected = text_is_date_dict[check_text]
+    assert CUtils.text_is_date_day(check_text) == ('day' in expected)
+    assert CUtils.text_is_date_month(check_text) == ('month' in expected)
+    assert CUtils.text_is_date_month_nosep(check_text) == ('month_nosep' in expected)
+    assert CUtils.text_is_date_year(check_text) == ('year' in expected)
+    assert CUtils.text_is_date(check_text) == ('date' in expected)
+    assert CUtils.text_is_datetime(check_text) == ('datetime' in expected)
+    assert CUtils.text_is_date_or_datetime(check_text) == ('date' in expected or 'datetime' in expected)
+
+
+def test_text_is_date_not_str():
+    assert CUtils.text_is_date(2020)
+    assert not CUtils.text_is_date_day(20201022)
+    assert not CUtils.text_is_datetime(None)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2020-10-22 22:22:22.345', '2020-10-22 22:22:22'), ('20201022 222222', '2020-10-22 22:22:22'),
+    ('2020-10-22T22:22:22', '2020-10-22 22:22:22'), ('2020/10/22 22:22:22', '2020-10-22 22:22:22')
+])
+def test_to_day_and_time_format(text, expected):
+    assert CUtils.to_day_and_time_format(text, None) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('影像 数据', 'yxsj'), ('ABC 影像', 'abcyx'), ('数据123', 'sj123'), ('测试-a_b', 'cs-a_b'),
+    ('啊', 'a'), ('座', 'z'), ('鑫', '鑫'), ('〇', '〇'), ('', None), ('  ', None), (None, None)
+])
+def test_alpha_text(text, expected):
+    assert CUtils.alpha_text(text) == expected
+
+
+def test_alpha_text_batch():
+    text_list = ['影像 数据', '', None, '数据123', '影像 数据', 'ABC']
+    assert CUtils.alpha_text_batch(text_list) == [CUtils.alpha_text(text) for text in text_list]
+    assert CUtils.alpha_text_batch([]) == []